@@ -0,0 +1,40 @@
+import numpy as np
+import bpy
+
+# Keyframe properties read and written with foreach_get/foreach_set, name, values per key and dtype
+KEYFRAME_ARRAYS = (
+    ('co', 2, np.float32),
+    ('handle_left', 2, np.float32),
+    ('handle_right', 2, np.float32),
+    ('interpolation', 1, np.int32),
+    ('easing', 1, np.int32),
+    ('handle_left_type', 1, np.int32),
+    ('handle_right_type', 1, np.int32),
+    ('type', 1, np.int32),
+    ('back', 1, np.float32),
+    ('amplitude', 1, np.float32),
+    ('period', 1, np.float32),
+)
+
+
+def copy_fcurve(curve: bpy.types.FCurve, channelbag: bpy.types.ActionChannelbag):
+    new_curve = channelbag.fcurves.new(curve.data_path, index=curve.array_index)
+    new_curve.extrapolation = curve.extrapolation
+    new_curve.mute = curve.mute
+
+    if curve.group is not None:
+        group = channelbag.groups.get(curve.group.name) or channelbag.groups.new(curve.group.name)
+        new_curve.group = group
+
+    src = curve.keyframe_points
+    dst = new_curve.keyframe_points
+    count = len(src)
+    dst.add(count)
+
+    for attr, size, dtype in KEYFRAME_ARRAYS:
+        data = np.empty(count * size, dtype=dtype)
+        src.foreach_get(attr, data)
+        dst.foreach_set(attr, data)
+
+    new_curve.update()
+    return new_curve
@@ -1,10 +1,11 @@
-from . import (animation_utils, asset_browser_utils, audio_gen, bone_layers,
+from . import (armature_index, animation_utils, asset_browser_utils, audio_gen, bone_layers,
                context_pie, context_pie_new, daz_diff_utils, materials,
                mesh_utils, modifier_search, new_rig, render_settings, geo_node,
                sequencer_utils, space_switcher, utils_panel, uv_utils, action_selector, action_exporter,
                camera_selector, new_rig, rift, rift_character, rift_frame_manager)
 
 modules = (
+    armature_index,
     bone_layers,
     action_selector,
     action_exporter,
@@ -1,4 +1,6 @@
 import bpy
+from . import action_users
+from .action_users import action_users_cache
 from .trigger_export_ops import ActionExportTriggerOps
 from .action_list_export import action_list_export
 from .export_ops import ActionExportOps
@@ -9,19 +11,6 @@ class ZENU_PT_action_export(BasePanel):
     bl_label = 'Action Export'
     bl_context = ''
 
-    def get_action_slot(self, obj: bpy.types.Object, action: bpy.types.Action):
-        if obj.animation_data is None:
-            return None
-
-        if obj.animation_data.action != action:
-            for track in obj.animation_data.nla_tracks:
-                for strip in track.strips:
-                    if strip.action == action:
-                        return strip.action_slot
-        else:
-            return obj.animation_data.action_slot
-
-        return None
     def get_action_nla(self, obj: bpy.types.Object, action: bpy.types.Action):
         if obj.animation_data is None:
             return None
@@ -58,6 +47,8 @@ class ZENU_PT_action_export(BasePanel):
         
         row.prop(active_item, 'use_bake_only_animated',
             text='Only Animated', icon='ANIM_DATA')
+        if active_item.use_bake_only_animated:
+            box.prop(active_item, 'mask_mode', text='')
         
         lay.prop(active_item, 'export_animinfo',
                  text='Export AnimInfo', icon='ANIM_DATA')
@@ -135,6 +126,12 @@ class ZENU_PT_action_export(BasePanel):
 
         op.item_uuid = active_item.uuid
 
+        row = col.row(align=True)
+        op = ActionExportOps.draw_action(
+            row, ActionExportOps.action_batch_export, text='Export All', icon='EXPORT')
+        op.workers = context.scene.zenu_action_export_workers
+        row.prop(context.scene, 'zenu_action_export_workers', text='Workers')
+
         self.draw_export_settings(layout)
         self.draw_trigger(layout)
 
@@ -167,24 +164,19 @@ class ZENU_PT_action_export(BasePanel):
                 pass
 
 
-        for obj in bpy.data.objects:
-            has_obj = data.has_object(obj.name)
-            action_slot = self.get_action_slot(obj, action)
-
-            if has_obj or not action_slot:
+        for name, slot_name in action_users_cache.get(action):
+            if data.has_object(name):
                 continue
 
             box = col.box()
             row = box.row(align=True)
             row.scale_y = 1.4
-            row.label(text=obj.name)
-            row.alert = has_obj
+            row.label(text=name)
 
             op = ActionExportOps.draw_action(
                 row, ActionExportOps.action_toggle, text='', icon='ADD')
-            op.name = obj.name
-            op.slot = action_slot.name_display
-
+            op.name = name
+            op.slot = slot_name
 
 reg, unreg = bpy.utils.register_classes_factory((
     ZENU_PT_action_export,
@@ -195,9 +187,14 @@ reg, unreg = bpy.utils.register_classes_factory((
 
 def register():
     action_list_export.register()
+    action_users.register()
     reg()
+    bpy.types.Scene.zenu_action_export_workers = bpy.props.IntProperty(
+        default=1, min=1, soft_max=16, description='Background Blender processes used by Export All')
 
 
 def unregister():
     action_list_export.unregister()
+    action_users.unregister()
     unreg()
+    del bpy.types.Scene.zenu_action_export_workers
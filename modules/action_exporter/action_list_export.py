@@ -35,7 +35,7 @@ class ActionExportList(ZenuUIList[ActionExport]):
         item = super().add()
         item.name = 'No Name'
         item.uuid = uuid.uuid4().hex
-        item.data = ActionExportItem().to_json()
+        item.save_anim_info(ActionExportItem())
         return item
 
 
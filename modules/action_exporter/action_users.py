@@ -0,0 +1,75 @@
+import bpy
+from bpy.app.handlers import persistent
+
+
+def get_action_slot(obj: bpy.types.Object, action: bpy.types.Action):
+    if obj.animation_data is None:
+        return None
+
+    if obj.animation_data.action != action:
+        for track in obj.animation_data.nla_tracks:
+            for strip in track.strips:
+                if strip.action == action:
+                    return strip.action_slot
+    else:
+        return obj.animation_data.action_slot
+
+    return None
+
+
+class ActionUsersCache:
+    """Objects using action directly or in NLA with their slot, rescanned only after depsgraph updates"""
+    _revision: int = 0
+    _entries: dict[int, tuple[int, list[tuple[str, str]]]]
+
+    def __init__(self):
+        self._entries = {}
+
+    def invalidate(self):
+        self._revision += 1
+
+    def get(self, action: bpy.types.Action) -> list[tuple[str, str]]:
+        if action is None:
+            return []
+
+        revision, users = self._entries.get(action.session_uid, (None, None))
+
+        if revision == self._revision:
+            return users
+
+        users = []
+        for obj in bpy.data.objects:
+            slot = get_action_slot(obj, action)
+
+            if slot:
+                users.append((obj.name, slot.name_display))
+
+        self._entries[action.session_uid] = self._revision, users
+        return users
+
+
+action_users_cache = ActionUsersCache()
+
+
+@persistent
+def invalidate_action_users(*args):
+    action_users_cache.invalidate()
+
+
+HANDLERS = (
+    bpy.app.handlers.depsgraph_update_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+)
+
+
+def register():
+    for handler in HANDLERS:
+        handler.append(invalidate_action_users)
+
+
+def unregister():
+    for handler in HANDLERS:
+        if invalidate_action_users in handler:
+            handler.remove(invalidate_action_users)
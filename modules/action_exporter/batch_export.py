@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+import bpy
+
+from ...worker_pool import WorkerPool
+from .utils import get_bones_mask
+
+if TYPE_CHECKING:
+    from .models import ActionExport
+
+WORKER_ENTRY = 'modules.action_exporter.batch_export:export_items'
+
+
+@dataclass
+class ExportGroup:
+    """Items sharing armatures and bone mask, scene is prepared once for all of them"""
+    objects: tuple[str, ...]
+    mask_mode: str | None = None
+    bones_mask: tuple[tuple[str, ...], ...] | None = None
+    additive: str | None = None
+    export_mesh: bool = False
+    items: list[str] = field(default_factory=list)
+
+
+def get_group_key(item: 'ActionExport'):
+    data = item.load_anim_info()
+    objects = tuple(sorted(data.objects))
+
+    mask_mode = None
+    bones_mask = None
+    if item.use_bake_only_animated and not item.use_additive:
+        mask_mode = item.mask_mode
+
+    # Direct mode filters curves per item, armature copies are shared only for equal masks
+    if mask_mode == 'DUPLICATE':
+        bones_mask = tuple(
+            tuple(get_bones_mask(bpy.data.objects[name], item.action))
+            for name in objects
+            if name in bpy.data.objects
+        )
+
+    additive = None
+    if item.use_additive:
+        additive = getattr(item.action_additive, 'name', '')
+
+    return objects, mask_mode, bones_mask, additive, item.export_mesh
+
+
+def plan_groups(items: Iterable['ActionExport']) -> list[ExportGroup]:
+    groups: dict[tuple, ExportGroup] = {}
+
+    for item in items:
+        if item.action is None:
+            continue
+
+        key = get_group_key(item)
+        group = groups.get(key)
+
+        if group is None:
+            group = ExportGroup(*key)
+            groups[key] = group
+
+        group.items.append(item.uuid)
+
+    return list(groups.values())
+
+
+def export_items(data: dict[str, Any], progress: Callable[[str], None]) -> list[str]:
+    """Worker side of ExportPool, add-on is not registered in background Blender"""
+    from . import register
+    from .export_ops import ActionExportOps
+
+    register()
+
+    fd, result_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+
+    try:
+        getattr(bpy.ops.zenu, ActionExportOps.bl_idname().removeprefix('ZENU_OT_'))(
+            action=ActionExportOps.get_action(ActionExportOps.action_batch_export),
+            item_uuids=','.join(data['items']),
+            workers=1,
+            result_path=result_path,
+        )
+
+        with open(result_path) as fs:
+            return json.loads(fs.read())
+    finally:
+        os.remove(result_path)
+
+
+class ExportPool:
+    """Export groups in background Blender processes from a saved snapshot of current file"""
+    _workers: int
+
+    def __init__(self, workers: int):
+        self._workers = max(1, workers)
+
+    def export(self, groups: list[ExportGroup]) -> list[str]:
+        workers = min(self._workers, len(groups))
+
+        # Whole groups per worker so setup still happens once per group
+        results = WorkerPool(WORKER_ENTRY, 'Action export').run([
+            {'items': [uuid for group in groups[index::workers] for uuid in group.items]}
+            for index in range(workers)
+        ])
+
+        return [path for paths in results for path in paths]
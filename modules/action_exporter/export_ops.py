@@ -1,12 +1,14 @@
 from dataclasses import dataclass
-import os
+import json
 
-from .utils import export_animinfo
+from .batch_export import ExportGroup, ExportPool, plan_groups
+from .masked_action import create_masked_action
+from .utils import export_animinfo, export_item_gltf, get_bones_mask
 from .action_list_export import action_list_export
 from .models import ActionExport
 from .models import ActionExportObject
 from ..base_operator.action_operator import ActionOperator
-from ...utils import get_modifier
+from ..armature_index import armature_index
 import bpy
 
 
@@ -67,6 +69,9 @@ class ActionExportOps(ActionOperator):
     name: bpy.props.StringProperty()
     slot: bpy.props.StringProperty()
     item_uuid: bpy.props.StringProperty()
+    item_uuids: bpy.props.StringProperty()
+    workers: bpy.props.IntProperty(default=1, min=1)
+    result_path: bpy.props.StringProperty()
 
     def get_slot(self, action: bpy.types.Action, slot_name: str):
         for sl in action.slots:
@@ -89,21 +94,12 @@ class ActionExportOps(ActionOperator):
         for obj_name in delete_list:
             del data.objects[obj_name]
 
-        item.data = data.to_dict()
+        if delete_list:
+            item.save_anim_info(data)
         return objs
 
     def apply_bones_mask(self, target_obj: bpy.types.Object, action: bpy.types.Action):
-        data: bpy.types.Armature = target_obj.data
-        bones_mask = []
-        for curve in action.fcurves:
-            try:
-                bone_name = curve.data_path.replace(
-                    'pose.bones["', '').split('"]')[0]
-                data.bones[bone_name]
-                bones_mask.append(bone_name)
-            except Exception:
-                print('[Bake Only Selected] Error with', curve)
-
+        bones_mask = get_bones_mask(target_obj, action)
         new_obj = remove_bone_by_mask(target_obj, bones_mask)
 
         modifiers = []
@@ -156,115 +152,118 @@ class ActionExportOps(ActionOperator):
         if name in data.objects:
             del data.objects[name]
         else:
-            data.objects[name] = ActionExportObject(slot=self.slot).to_dict()
+            data.objects[name] = ActionExportObject(slot=self.slot)
 
-        item.data = data.to_dict()
+        item.save_anim_info(data)
 
     def create_edit_data(self):
         return {
             'scene_name': bpy.context.scene.name,
-            'animation': {}
+            'animation': {},
+            'masked_actions': []
         }
 
-    def default_export_prepare(self, item: ActionExport):
-        data = item.load_anim_info()
-        action: bpy.types.Action = item.action
+    def select_meshes(self, obj: bpy.types.Object):
+        for i in armature_index.get_objects(obj):
+            i.select_set(True)
+
+    def group_export_prepare(self, group: ExportGroup, item: ActionExport):
+        """Selection, bone masks and NLA state shared by every item of the group"""
         edit_data = self.create_edit_data()
 
         for obj in self.get_objects(item):
-            mask = None
-            name = obj.name
-            if item.use_bake_only_animated:
-                mask = self.apply_bones_mask(obj, action)
-                mask.new_obj.select_set(True)
-                name = mask.new_obj.name
-
-                mask.new_obj.animation_data.action_blend_type = 'REPLACE'
-                mask.new_obj.animation_data.action = action
-                mask.new_obj.animation_data.action_slot = self.get_slot(
-                    action, data.get_object(name).slot)
-            else:
-                obj.select_set(True)
-
-            edit_data['animation'][obj] = {
+            state = {
+                'name': obj.name,
                 'action': obj.animation_data.action,
                 'blend_type': obj.animation_data.action_blend_type,
-                'undo_mask': mask
+                'undo_mask': None
             }
+            edit_data['animation'][obj] = state
+            export_obj = obj
+
+            if group.additive is not None:
+                strips = state['strips'] = {}
+                obj.animation_data.action_blend_type = 'COMBINE'
+
+                for track in obj.animation_data.nla_tracks:
+                    for strip in track.strips:
+                        strips[strip] = {'mute': strip.mute,
+                                         'frame_end': strip.frame_end}
+                        if strip.action != item.action_additive:
+                            strip.mute = True
+                        else:
+                            strip.mute = False
+                            strip.frame_end = 0
+            else:
+                obj.animation_data.action_blend_type = 'REPLACE'
 
-            obj.animation_data.action_blend_type = 'REPLACE'
-            obj.animation_data.action = action
-            obj.animation_data.action_slot = self.get_slot(
-                action, data.get_object(name).slot)
+                if group.mask_mode == 'DUPLICATE':
+                    mask = self.apply_bones_mask(obj, item.action)
+                    mask.new_obj.animation_data.action_blend_type = 'REPLACE'
+                    state['undo_mask'] = mask
+                    export_obj = mask.new_obj
+
+            export_obj.select_set(True)
 
             if item.export_mesh:
-                for i in bpy.data.objects:
-                    arm_mod: bpy.types.ArmatureModifier = get_modifier(
-                        i, bpy.types.ArmatureModifier)
-                    if arm_mod is None:
-                        continue
+                self.select_meshes(export_obj)
 
-                    if arm_mod.object == obj:
-                        i.select_set(True)
+        return edit_data
 
-            # if item.use_bake_only_animated:
+    def remove_masked_actions(self, edit_data: dict):
+        for action in edit_data['masked_actions']:
+            bpy.data.actions.remove(action)
 
-        return edit_data
+        edit_data['masked_actions'].clear()
 
-    def additive_export_prepare(self, item: ActionExport):
+    def group_export_assign(self, edit_data: dict, group: ExportGroup, item: ActionExport):
         data = item.load_anim_info()
-        action: bpy.types.Action = item.action
-        edit_data = self.create_edit_data()
+        masked_actions = list(edit_data['masked_actions'])
+        edit_data['masked_actions'].clear()
 
-        bpy.context.scene.name = item.name
+        for obj, state in edit_data['animation'].items():
+            action: bpy.types.Action = item.action
+            slot = self.get_slot(action, data.get_object(state['name']).slot)
+            targets = [obj]
 
-        for obj in self.get_objects(item):
-            strips = {}
-            edit_data['animation'][obj] = {
-                'action': obj.animation_data.action,
-                'strips': strips,
-                'blend_type': obj.animation_data.action_blend_type
-            }
-            obj.animation_data.action_blend_type = 'COMBINE'
-            obj.select_set(True)
+            if state['undo_mask']:
+                targets.append(state['undo_mask'].new_obj)
 
-            obj.animation_data.action = action
-            obj.animation_data.action_slot = self.get_slot(
-                action, data.get_object(obj.name).slot)
+            if group.mask_mode == 'DIRECT' and slot is not None:
+                action = create_masked_action(action, slot, set(get_bones_mask(obj, action, slot)))
+                slot = action.slots[0]
+                edit_data['masked_actions'].append(action)
 
-            for track in obj.animation_data.nla_tracks:
-                for strip in track.strips:
-                    strips[strip] = {'mute': strip.mute,
-                                     'frame_end': strip.frame_end}
-                    if strip.action != item.action_additive:
-                        strip.mute = True
-                    else:
-                        strip.mute = False
-                        strip.frame_end = 0
+            for target in targets:
+                target.animation_data.action = action
+                target.animation_data.action_slot = slot
 
-            if item.export_mesh:
-                for i in bpy.data.objects:
-                    arm_mod: bpy.types.ArmatureModifier = get_modifier(
-                        i, bpy.types.ArmatureModifier)
-                    if arm_mod is None:
-                        continue
+        # Previous item actions are unassigned now
+        for action in masked_actions:
+            bpy.data.actions.remove(action)
 
-                    if arm_mod.object == obj:
-                        i.select_set(True)
+    def group_export_restore(self, edit_data: dict):
+        for obj, data in edit_data['animation'].items():
+            undo_mask = data.get('undo_mask')
 
-        return edit_data
+            if undo_mask:
+                undo_mask.undo()
 
-    def action_export(self, context: bpy.types.Context):
-        item = action_list_export.get_by_id(self.item_uuid)
+            obj.animation_data.action = data['action']
+            obj.animation_data.action_blend_type = data['blend_type']
 
-        data = item.load_anim_info()
-        action: bpy.types.Action = item.action
-        mode = bpy.context.active_object.mode
-        prev_range = (context.scene.frame_start, context.scene.frame_end)
-        active_object = context.active_object
+            for strip, strip_data in data.get('strips', {}).items():
+                strip.mute = strip_data['mute']
+                strip.frame_end = strip_data['frame_end']
+
+        self.remove_masked_actions(edit_data)
+        bpy.context.scene.name = edit_data['scene_name']
 
-        context.scene.frame_start = int(action.frame_start)
-        context.scene.frame_end = int(action.frame_end)
+    def export_groups(self, context: bpy.types.Context, groups: list[ExportGroup]) -> list[str]:
+        items = {i.uuid: i for i in action_list_export.prop_list}
+        active_object = context.active_object
+        mode = active_object.mode if active_object else 'OBJECT'
+        prev_range = (context.scene.frame_start, context.scene.frame_end)
 
         try:
             bpy.ops.object.mode_set(mode='OBJECT')
@@ -272,58 +271,33 @@ class ActionExportOps(ActionOperator):
             pass
 
         selected_object = list(bpy.context.selected_objects).copy()
-        bpy.ops.object.select_all(action='DESELECT')
-
-        export_mode = ''
+        paths = []
 
-        if item.use_additive:
-            edit_data = self.additive_export_prepare(item)
-            export_mode = 'SCENE'
-        else:
-            edit_data = self.default_export_prepare(item)
-            export_mode = 'ACTIVE_ACTIONS'
-
-        filepath = f'{os.path.join(bpy.path.abspath(item.export_path), item.name)}.glb'
-
-        bpy.ops.export_scene.gltf(
-            filepath=filepath,
-            use_selection=True,
-            export_animation_mode=export_mode,
-            export_anim_scene_split_object=False,
-            export_nla_strips_merged_animation_name=item.name,
-            export_image_format='AUTO' if item.export_textures else 'NONE',
-            use_renderable=False,
-            export_reset_pose_bones=False,
-            export_rest_position_armature=False,
-        
-            export_vertex_color='ACTIVE',
-            export_all_vertex_colors=False,
-            export_force_sampling=not item.use_bake_only_animated,
-            export_apply=item.apply_mods,
-            # export_def_bones=True
-        )
+        for group in groups:
+            group_items = [items[uuid] for uuid in group.items]
+            export_mode = 'SCENE' if group.additive is not None else 'ACTIVE_ACTIONS'
 
-        if item.export_animinfo:
-            export_animinfo(item)
+            bpy.ops.object.select_all(action='DESELECT')
+            edit_data = self.group_export_prepare(group, group_items[0])
 
-        bpy.ops.object.select_all(action='DESELECT')
+            try:
+                for item in group_items:
+                    action: bpy.types.Action = item.action
+                    self.group_export_assign(edit_data, group, item)
 
-        for obj, data in edit_data['animation'].items():
-            obj.animation_data.action = data['action']
-            obj.animation_data.action_blend_type = data['blend_type']
-            undo_mask = data.get('undo_mask')
+                    context.scene.frame_start = int(action.frame_start)
+                    context.scene.frame_end = int(action.frame_end)
+                    if group.additive is not None:
+                        context.scene.name = item.name
 
-            if undo_mask:
-                undo_mask.undo()
+                    paths.append(export_item_gltf(item, export_mode))
 
-            try:
-                for strip, strip_data in data['strips'].items():
-                    strip.mute = strip_data['mute']
-                    strip.frame_end = strip_data['frame_end']
-            except KeyError:
-                pass
+                    if item.export_animinfo:
+                        export_animinfo(item)
+            finally:
+                bpy.ops.object.select_all(action='DESELECT')
+                self.group_export_restore(edit_data)
 
-        bpy.context.scene.name = edit_data['scene_name']
         bpy.ops.object.select_all(action='DESELECT')
         for obj in selected_object:
             obj.select_set(True)
@@ -335,4 +309,37 @@ class ActionExportOps(ActionOperator):
             bpy.ops.object.mode_set(mode=mode)
         except Exception:
             pass
+
+        return paths
+
+    def action_export(self, context: bpy.types.Context):
+        item = action_list_export.get_by_id(self.item_uuid)
+        groups = plan_groups([item])
+
+        if not groups:
+            self.report({'ERROR'}, 'No action to export')
+            return
+
+        filepath, = self.export_groups(context, groups)
+
         self.report({'INFO'}, f'Exported to {filepath}')
+
+    def action_batch_export(self, context: bpy.types.Context):
+        items = action_list_export.prop_list
+
+        if self.item_uuids:
+            uuids = set(self.item_uuids.split(','))
+            items = [i for i in items if i.uuid in uuids]
+
+        groups = plan_groups(items)
+
+        if self.workers > 1 and len(groups) > 1:
+            paths = ExportPool(self.workers).export(groups)
+        else:
+            paths = self.export_groups(context, groups)
+
+        if self.result_path:
+            with open(self.result_path, mode='w') as fs:
+                fs.write(json.dumps(paths))
+
+        self.report({'INFO'}, f'Exported {len(paths)} actions in {len(groups)} groups')
@@ -0,0 +1,35 @@
+from typing import Container
+
+import bpy
+from bpy_extras import anim_utils
+
+from ...fcurve_utils import copy_fcurve
+
+
+def get_curve_bone(data_path: str) -> str | None:
+    if not data_path.startswith('pose.bones["'):
+        return None
+
+    return data_path.replace('pose.bones["', '').split('"]')[0]
+
+
+def create_masked_action(action: bpy.types.Action, slot: bpy.types.ActionSlot,
+                         bones_mask: Container[str]) -> bpy.types.Action:
+    """Temporary action with only curves of slot which animate bones from mask"""
+    masked = bpy.data.actions.new(f'{action.name}_masked')
+    masked.use_fake_user = False
+    masked.use_frame_range = action.use_frame_range
+    masked.frame_start, masked.frame_end = action.frame_range
+
+    masked_slot = masked.slots.new(slot.target_id_type, slot.name_display)
+    channelbag = anim_utils.action_ensure_channelbag_for_slot(masked, masked_slot)
+    src_channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
+
+    if src_channelbag is None:
+        return masked
+
+    for curve in src_channelbag.fcurves:
+        if get_curve_bone(curve.data_path) in bones_mask:
+            copy_fcurve(curve, channelbag)
+
+    return masked
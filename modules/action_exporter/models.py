@@ -104,6 +104,37 @@ class ExportTriggerData:
             return cls()
 
 
+class AnimInfoCache:
+    """Parsed ActionExportItem per export item, reparsed only when data string changes"""
+    hits: int = 0
+    misses: int = 0
+    _entries: dict[str, tuple[str, ActionExportItem]]
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, uuid: str, data: str) -> ActionExportItem:
+        entry = self._entries.get(uuid)
+
+        if entry is not None and entry[0] == data:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        model = ActionExportItem.from_json(data)
+        self._entries[uuid] = data, model
+        return model
+
+    def store(self, uuid: str, data: str, model: ActionExportItem):
+        self._entries[uuid] = data, model
+
+    def clear(self):
+        self._entries.clear()
+
+
+anim_info_cache = AnimInfoCache()
+
+
 class ActionExport(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty()
     action: bpy.props.PointerProperty(type=bpy.types.Action)
@@ -118,6 +149,10 @@ class ActionExport(bpy.types.PropertyGroup):
 
     use_additive: bpy.props.BoolProperty()
     use_bake_only_animated: bpy.props.BoolProperty()
+    mask_mode: bpy.props.EnumProperty(items=(
+        ('DIRECT', 'Direct', 'Export a temporary action with only animated bone curves'),
+        ('DUPLICATE', 'Duplicate Armature', 'Export a copy of armature following original with constraints'),
+    ), default='DUPLICATE')
     action_additive: bpy.props.PointerProperty(type=bpy.types.Action)
 
     trigger_data: bpy.props.StringProperty()
@@ -127,7 +162,12 @@ class ActionExport(bpy.types.PropertyGroup):
         pass
 
     def load_anim_info(self):
-        return ActionExportItem.from_json(self.data)
+        return anim_info_cache.get(self.uuid, self.data)
+
+    def save_anim_info(self, model: ActionExportItem):
+        data = model.to_json()
+        self.data = data
+        anim_info_cache.store(self.uuid, data, model)
 
     def load_triggers(self):
         return ExportTriggerData.from_json(self.trigger_data)
@@ -2,6 +2,7 @@ import json
 import os
 from typing import TYPE_CHECKING
 import bpy
+from bpy_extras import anim_utils
 
 if TYPE_CHECKING:
     from .action_list_export import ActionExport
@@ -16,4 +17,52 @@ def export_animinfo(item: 'ActionExport'):
         data['frames'] = item.action.frame_end - item.action.frame_start
         f.write(json.dumps(data))
     
-    return filepath
\ No newline at end of file
+    return filepath
+
+
+def get_bones_mask(target_obj: bpy.types.Object, action: bpy.types.Action,
+                   slot: bpy.types.ActionSlot = None) -> list[str]:
+    """Animated bones of armature, with slot only curves of its channelbag are read"""
+    data: bpy.types.Armature = target_obj.data
+    bones_mask = []
+
+    if slot is None:
+        fcurves = action.fcurves
+    else:
+        channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
+        fcurves = channelbag.fcurves if channelbag is not None else ()
+
+    for curve in fcurves:
+        try:
+            bone_name = curve.data_path.replace(
+                'pose.bones["', '').split('"]')[0]
+            data.bones[bone_name]
+            bones_mask.append(bone_name)
+        except Exception:
+            print('[Bake Only Selected] Error with', curve)
+
+    return bones_mask
+
+
+def export_item_gltf(item: 'ActionExport', export_mode: str):
+    filepath = f'{os.path.join(bpy.path.abspath(item.export_path), item.name)}.glb'
+
+    bpy.ops.export_scene.gltf(
+        filepath=filepath,
+        use_selection=True,
+        export_animation_mode=export_mode,
+        export_anim_scene_split_object=False,
+        export_nla_strips_merged_animation_name=item.name,
+        export_image_format='AUTO' if item.export_textures else 'NONE',
+        use_renderable=False,
+        export_reset_pose_bones=False,
+        export_rest_position_armature=False,
+
+        export_vertex_color='ACTIVE',
+        export_all_vertex_colors=False,
+        export_force_sampling=not item.use_bake_only_animated,
+        export_apply=item.apply_mods,
+        # export_def_bones=True
+    )
+
+    return filepath
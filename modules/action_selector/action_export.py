@@ -4,7 +4,7 @@ import os
 import uuid
 import bpy
 
-from ...utils import get_modifier
+from ..armature_index import armature_index
 
 from ..new_rig import ActionOperator
 
@@ -194,14 +194,8 @@ class ActionExportOps(ActionOperator):
                 action, data.get_object(obj.name).slot)
 
             if item.export_mesh:
-                for i in bpy.data.objects:
-                    arm_mod: bpy.types.ArmatureModifier = get_modifier(
-                        i, bpy.types.ArmatureModifier)
-                    if arm_mod is None:
-                        continue
-
-                    if arm_mod.object == obj:
-                        i.select_set(True)
+                for i in armature_index.get_objects(obj):
+                    i.select_set(True)
         return edit_data
 
     def additive_export_prepare(self, item: ActionExport):
@@ -235,14 +229,8 @@ class ActionExportOps(ActionOperator):
                         strip.frame_end = 0
 
             if item.export_mesh:
-                for i in bpy.data.objects:
-                    arm_mod: bpy.types.ArmatureModifier = get_modifier(
-                        i, bpy.types.ArmatureModifier)
-                    if arm_mod is None:
-                        continue
-
-                    if arm_mod.object == obj:
-                        i.select_set(True)
+                for i in armature_index.get_objects(obj):
+                    i.select_set(True)
 
         return edit_data
 
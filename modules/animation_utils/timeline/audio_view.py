@@ -5,6 +5,8 @@ from typing import Any
 import blf
 import bpy
 import gpu
+import numpy as np
+from bpy.app.handlers import persistent
 from gpu_extras.batch import batch_for_shader
 from ....utils import update_window
 from ....base_panel import BasePanel
@@ -63,101 +65,191 @@ class TimelineAudio(bpy.types.PropertyGroup):
     offset_y: bpy.props.IntProperty(name='Offset Y', default=100)
 
 
+@dataclass
+class SpacesLayout:
+    key: tuple
+    batch: gpu.types.GPUBatch | None
+    labels: list[tuple[float, float, str]]
+
+
 class SpacesDrawer(GpuDrawer):
-    shader: gpu.types.GPUShader
-    batch: gpu.types.GPUBatch
-    _spaces: list[tuple[int, int]]
+    """All strips in one batch built in frame space, view transform is applied in shader"""
+    _shader: gpu.types.GPUShader | None = None
+    _layouts: dict[str, SpacesLayout]
+    _revision: int = 0
 
     def __init__(self):
+        self._layouts = {}
+
+    @property
+    def shader(self) -> gpu.types.GPUShader:
+        # Created on first draw, GPU module is not available in background mode
+        if self._shader is None:
+            self._shader = self.create_shader()
+
+        return self._shader
+
+    @staticmethod
+    def create_shader() -> gpu.types.GPUShader:
         vert_out = gpu.types.GPUStageInterfaceInfo('my_interface')
-        vert_out.smooth('VEC3', 'pos')
-        self._spaces = []
+        vert_out.smooth('VEC3', 'col')
         shader_info = gpu.types.GPUShaderCreateInfo()
         shader_info.push_constant('MAT4', 'ModelViewProjectionMatrix')
         shader_info.push_constant('FLOAT', 'opacity')
-        shader_info.push_constant('VEC3', "offset")
-        shader_info.push_constant('VEC3', "scale")
-        shader_info.vertex_in(0, 'VEC3', 'position')
+        shader_info.push_constant('VEC2', "offset")
+        shader_info.push_constant('VEC2', "scale")
+        shader_info.vertex_in(0, 'VEC2', 'position')
+        shader_info.vertex_in(1, 'VEC3', 'color')
         shader_info.vertex_out(vert_out)
         shader_info.fragment_out(0, 'VEC4', 'fragColor')
 
         shader_info.vertex_source(
             'void main()'
             '{'
-            '  pos = position;'
-            '  gl_Position = ModelViewProjectionMatrix * vec4((position * scale) + offset, 1.0f);'
+            '  col = color;'
+            '  gl_Position = ModelViewProjectionMatrix * vec4((position * scale) + offset, 0.0f, 1.0f);'
             '}'
         )
 
         shader_info.fragment_source(
             'void main()'
             '{'
-            '  fragColor = vec4(vec3(pos.x, 1 - pos.x, 0), opacity);'
+            '  fragColor = vec4(col, opacity);'
             '}'
         )
 
-        vertices = (
-            (0, 0), (1, 0),
-            (0, 1), (1, 1))
+        return gpu.shader.create_from_info(shader_info)
+
+    def invalidate(self):
+        self._revision += 1
+
+    def get_key(self, strips, settings: TimelineAudio) -> tuple:
+        count = len(strips)
+        starts = np.empty(count, dtype=np.int32)
+        ends = np.empty(count, dtype=np.int32)
+        mute = np.empty(count, dtype=np.int32)
+        strips.foreach_get('frame_final_start', starts)
+        strips.foreach_get('frame_final_end', ends)
+        strips.foreach_get('mute', mute)
+
+        # Names are part of key, renamed strip changes labels without any frame change
+        return (
+            self._revision,
+            settings.symbol_limit,
+            hash((starts.tobytes(), ends.tobytes(), mute.tobytes(), tuple(i.name for i in strips)))
+        )
+
+    def build_layout(self, key: tuple, strips, settings: TimelineAudio) -> SpacesLayout:
+        spans = []
+        labels = []
+
+        for i in strips:
+            if i.mute: continue
+
+            name = i.name
+
+            if len(name) > settings.symbol_limit:
+                name = name[0:settings.symbol_limit].strip() + '...'
+
+            spans.append((i.frame_final_start, i.frame_final_end))
+            labels.append((i.frame_final_start, i.frame_final_end, name))
+
+        if not spans:
+            return SpacesLayout(key, None, labels)
+
+        spans = np.array(spans, dtype=np.float32)
+        count = len(spans)
+
+        # Quad per strip, x in frames and y from 0 to 1, gradient from start to end
+        position = np.empty((count, 4, 2), dtype=np.float32)
+        position[:, (0, 2), 0] = spans[:, 0, None]
+        position[:, (1, 3), 0] = spans[:, 1, None]
+        position[:, :, 1] = (0, 0, 1, 1)
+
+        color = np.zeros((count, 4, 3), dtype=np.float32)
+        color[:, (0, 2), 1] = 1
+        color[:, (1, 3), 0] = 1
+
+        indices = (np.arange(count, dtype=np.int32)[:, None, None] * 4 + ((0, 1, 2), (2, 1, 3))).reshape(-1, 3)
+
+        batch = batch_for_shader(self.shader, 'TRIS', {
+            'position': position.reshape(-1, 2),
+            'color': color.reshape(-1, 3)
+        }, indices=indices)
+
+        return SpacesLayout(key, batch, labels)
+
+    def get_layout(self, space_type: str, strips, settings: TimelineAudio) -> SpacesLayout:
+        """Layout per space type, dope sheet and graph editor have own settings"""
+        key = self.get_key(strips, settings)
+        layout = self._layouts.get(space_type)
+
+        if layout is None or layout.key != key:
+            layout = self._layouts[space_type] = self.build_layout(key, strips, settings)
+
+        return layout
 
-        indices = (
-            (0, 1, 2), (2, 1, 3))
+    def draw_labels(self, labels: list[tuple[float, float, str]], view2d: bpy.types.View2D, width: int,
+                    posy: float, size: float):
+        font_id = 0
+        blf.color(font_id, 1, 1, 1, 0.6)
+        blf.size(font_id, size)
 
-        shader = gpu.shader.create_from_info(shader_info)
-        batch = batch_for_shader(shader, 'TRIS', {'position': vertices}, indices=indices)
+        for start, end, text in labels:
+            x, _ = view2d.view_to_region(start, 0, clip=False)
+            x2, _ = view2d.view_to_region(end, 0, clip=False)
 
-        self.shader = shader
-        self.batch = batch
+            if x2 < 0 or x > width:
+                continue
 
-    def draw_space(self, start: int, end: int, text: str = None):
+            blf.position(font_id, x, posy - size, 0)
+            blf.draw(font_id, text)
+
+    def draw_spaces(self, layout: SpacesLayout):
         context: bpy.types.Context = bpy.context
-        scene = context.scene
 
         view2d = context.region.view2d
         height = context.region.height
 
         settings: TimelineAudio = get_timeline_audio(context)
-
-        shader = self.shader
-        batch = self.batch
         space_height = settings.line_thickness
 
         sizey, _ = view2d.view_to_region(0, 0, clip=False)
         sizey2, _ = view2d.view_to_region(10, 0, clip=False)
         scale_y = (sizey2 - sizey) / 1000
 
-        x, y = view2d.view_to_region(start, 1, clip=False)
-        x2, y2 = view2d.view_to_region(start + (end - start), 0, clip=False)
+        _, y = view2d.view_to_region(0, 1, clip=False)
+
+        # region_to_view gives float frames, view_to_region rounds to pixels
+        frame_left, _ = view2d.region_to_view(0, 0)
+        frame_right, _ = view2d.region_to_view(context.region.width, 0)
+        scale_x = context.region.width / max(frame_right - frame_left, 1e-6)
+        offset_x = -frame_left * scale_x
 
         if context.space_data.type == 'GRAPH_EDITOR':
-            posx, posy = x, (height - space_height - (settings.offset_y * scale_y)) - (height - y)
+            posy = (height - space_height - (settings.offset_y * scale_y)) - (height - y)
         else:
-            posx, posy = x, height - space_height - settings.offset_y
+            posy = height - space_height - settings.offset_y
 
-        # print()
-
-        if text and settings.enable_title:
+        if settings.enable_title and layout.labels:
             size = settings.title_size
 
             if settings.enable_title_auto_scale:
-                sizey, _ = view2d.view_to_region(0, 0, clip=False)
-                sizey2, _ = view2d.view_to_region(10, 0, clip=False)
                 size *= 6
                 size *= scale_y
 
-            font_id = 0
-            blf.color(font_id, 1, 1, 1, 0.6)
-            blf.position(font_id, posx, posy - size, 0)
-            blf.size(font_id, size)
-            blf.draw(font_id, text)
+            self.draw_labels(layout.labels, view2d, context.region.width, posy, size)
+
+        if layout.batch is None:
+            return
 
-        shader.uniform_float("scale", (x2 - x, space_height, 0))
-        shader.uniform_float("offset", (posx, posy, 0))
+        shader = self.shader
+        shader.uniform_float("scale", (scale_x, space_height))
+        shader.uniform_float("offset", (offset_x, posy))
         shader.uniform_float("opacity", settings.line_opacity)
 
-        # shader.uniform_float("color", (1, 1, 1, .1))
         gpu.state.blend_set('ALPHA')
-        batch.draw(shader)
+        layout.batch.draw(shader)
 
     def draw(self):
         context: bpy.types.Context = bpy.context
@@ -173,20 +265,12 @@ class SpacesDrawer(GpuDrawer):
         if scene.sequence_editor is None:
             return
 
-        strip = scene.sequence_editor.sequences_all
+        strips = scene.sequence_editor.sequences_all
 
-        if strip is None:
+        if strips is None:
             return
 
-        for i in strip:
-            name = i.name
-
-            if len(name) > settings.symbol_limit:
-                name = name[0:settings.symbol_limit].strip() + '...'
-
-            if i.mute: continue
-
-            self.draw_space(i.frame_final_start, i.frame_final_end, text=name)
+        self.draw_spaces(self.get_layout(context.space_data.type, strips, settings))
 
 
 ddraw = SpacesDrawer()
@@ -246,13 +330,31 @@ reg, unreg = bpy.utils.register_classes_factory((
 ))
 
 
+@persistent
+def invalidate_spaces(*args):
+    ddraw.invalidate()
+
+
+INVALIDATE_HANDLERS = (
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+)
+
+
 def register():
     reg()
     bpy.types.Scene.zenu_timeline_audio_de = bpy.props.PointerProperty(type=TimelineAudio)
     bpy.types.Scene.zenu_timeline_audio_ge = bpy.props.PointerProperty(type=TimelineAudio)
     ddraw.register()
 
+    for handler in INVALIDATE_HANDLERS:
+        handler.append(invalidate_spaces)
+
 
 def unregister():
     unreg()
     ddraw.unregister()
+
+    for handler in INVALIDATE_HANDLERS:
+        handler.remove(invalidate_spaces)
@@ -0,0 +1,141 @@
+import bpy
+from bpy.app.handlers import persistent
+
+
+class ArmatureIndex:
+    """Armature object <-> objects deformed by it through Armature modifiers"""
+    _objects: dict[int, dict[int, bpy.types.Object]]
+    _armatures: dict[int, list[bpy.types.Object]]
+    _pending: dict[int, bpy.types.Object]
+    _uids: frozenset[int] = frozenset()
+    _dirty: bool = True
+
+    def __init__(self):
+        self._objects = {}
+        self._armatures = {}
+        self._pending = {}
+
+    @staticmethod
+    def _get_uids() -> frozenset[int]:
+        return frozenset(obj.session_uid for obj in bpy.data.objects)
+
+    def invalidate(self):
+        self._dirty = True
+        self._pending.clear()
+
+    def tag_object(self, obj: bpy.types.Object):
+        if not self._dirty:
+            self._pending[obj.session_uid] = obj
+
+    def _remove_object(self, uid: int):
+        for arm in self._armatures.pop(uid, ()):
+            users = self._objects.get(arm.session_uid)
+
+            if users is not None:
+                users.pop(uid, None)
+
+    def _add_object(self, obj: bpy.types.Object):
+        armatures = [
+            mod.object
+            for mod in obj.modifiers
+            if mod.type == 'ARMATURE' and mod.object is not None
+        ]
+
+        if not armatures:
+            return
+
+        uid = obj.session_uid
+        self._armatures[uid] = armatures
+
+        for arm in armatures:
+            self._objects.setdefault(arm.session_uid, {})[uid] = obj
+
+    def rebuild(self):
+        self._objects.clear()
+        self._armatures.clear()
+        self._pending.clear()
+
+        for obj in bpy.data.objects:
+            self._add_object(obj)
+
+        self._uids = self._get_uids()
+        self._dirty = False
+
+    def ensure(self):
+        # Deleted object does not come in depsgraph updates, count alone misses delete followed by add
+        if self._dirty or self._uids != self._get_uids():
+            self.rebuild()
+            return
+
+        if not self._pending:
+            return
+
+        try:
+            for uid, obj in self._pending.items():
+                self._remove_object(uid)
+                self._add_object(obj)
+        except ReferenceError:
+            self.rebuild()
+            return
+
+        self._pending.clear()
+
+    def get_objects(self, armature: bpy.types.Object) -> list[bpy.types.Object]:
+        """Objects with Armature modifier pointing to armature"""
+        if armature is None:
+            return []
+
+        self.ensure()
+        return list(self._objects.get(armature.session_uid, {}).values())
+
+    def get_armatures(self, obj: bpy.types.Object) -> list[bpy.types.Object]:
+        """Armatures of object in modifier stack order"""
+        if obj is None:
+            return []
+
+        self.ensure()
+        return list(self._armatures.get(obj.session_uid, ()))
+
+    def get_armature(self, obj: bpy.types.Object) -> bpy.types.Object | None:
+        armatures = self.get_armatures(obj)
+
+        if not armatures:
+            return None
+
+        return armatures[0]
+
+
+armature_index = ArmatureIndex()
+
+
+@persistent
+def armature_index_update(scene, depsgraph: bpy.types.Depsgraph):
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object):
+            armature_index.tag_object(update.id.original)
+
+
+@persistent
+def armature_index_invalidate(*args):
+    armature_index.invalidate()
+
+
+INVALIDATE_HANDLERS = (
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+)
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(armature_index_update)
+
+    for handler in INVALIDATE_HANDLERS:
+        handler.append(armature_index_invalidate)
+
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(armature_index_update)
+
+    for handler in INVALIDATE_HANDLERS:
+        handler.remove(armature_index_invalidate)
@@ -1,13 +1,14 @@
 import json
 import os.path
 import random
+from collections import defaultdict
 
 import bpy
 from bpy_extras.io_utils import ImportHelper
 from .property_groups import TriggerCalcResult, realtime_data
 from .utils import calc_triggers, get_active_point, get_active_point_index, get_active_trigger, \
     get_active_trigger_index, \
-    add_sound
+    add_sound, sample_trajectories, scan_triggers, find_enter_frames
 from ...utils import get_collection
 
 
@@ -59,16 +60,14 @@ class ZENU_OT_trigger_action(bpy.types.Operator):
 class ZENU_OT_calculate_triggers(bpy.types.Operator):
     bl_label = 'Calculate Tringgers'
     bl_idname = 'zenu.calculate_triggers'
+    mode: bpy.props.EnumProperty(items=(
+        ('OFFLINE', 'Offline', 'Sample all trajectories once and detect triggers for every frame with NumPy'),
+        ('FRAMES', 'Per Frame', 'Check triggers after every frame change'),
+    ))
 
-    def execute(self, context: bpy.types.Context):
-        scene = context.scene
+    def execute_frames(self, scene: bpy.types.Scene):
         triggered = {}
         data = {}
-        s = scene.sequence_editor.sequences
-
-        for key, item in s.items():
-            if item.channel == 3:
-                s.remove(item)
 
         for i in range(scene.frame_start, scene.frame_end + 1):
             triggers = calc_triggers()
@@ -85,6 +84,43 @@ class ZENU_OT_calculate_triggers(bpy.types.Operator):
 
             scene.frame_set(i)
 
+    def execute_offline(self, scene: bpy.types.Scene):
+        # Same frames as per frame mode, it checks state before each frame_set
+        frames = range(scene.frame_start, scene.frame_end)
+        triggers = list(scene.zenu_at)
+        point_pos, trigger_pos, radii = sample_trajectories(scene, frames)
+        states = scan_triggers(point_pos, trigger_pos, radii)
+
+        cache = defaultdict(list)
+
+        for frame, index in find_enter_frames(states, frames):
+            trigger = triggers[index]
+            result = TriggerCalcResult(
+                trigger=trigger,
+                radius=float(radii[frame - frames.start, index]),
+                is_triggered=True
+            )
+
+            add_sound(False, result, frame)
+            cache[frame].append(trigger.name)
+
+        item = scene.zenu_trigger_cache.add()
+        item.data = json.dumps({'triggers': cache})
+        item.name = 'Cache'
+
+    def execute(self, context: bpy.types.Context):
+        scene = context.scene
+        s = scene.sequence_editor.sequences
+
+        for key, item in s.items():
+            if item.channel == 3:
+                s.remove(item)
+
+        if self.mode == 'OFFLINE':
+            self.execute_offline(scene)
+        else:
+            self.execute_frames(scene)
+
         return {'FINISHED'}
 
 
@@ -1,57 +1,189 @@
 import os
 import random
+import time
+from dataclasses import dataclass
 
+import numpy as np
 import bpy
+from mathutils import Vector
+from mathutils.kdtree import KDTree
+
 from .property_groups import AudioTrigger, TriggerCalcResult, AudioTriggerPoint
 
 
+@dataclass
+class SoundFolder:
+    mtime: float
+    checked: float
+    files: list[str]
+
+
+class SoundLibrary:
+    """File lists per sound folder, rescanned only when folder mtime changes"""
+    # Seconds between mtime checks, stat is slow on network drives
+    check_interval: float = 2
+    _folders: dict[str, SoundFolder]
+
+    def __init__(self):
+        self._folders = {}
+
+    def _scan(self, folder: str, mtime: float) -> SoundFolder:
+        files = sorted(entry.path for entry in os.scandir(folder) if entry.is_file())
+        return SoundFolder(mtime=mtime, checked=time.monotonic(), files=files)
+
+    def get_folder(self, folder: str) -> SoundFolder:
+        folder = os.path.normpath(folder)
+        entry = self._folders.get(folder)
+        now = time.monotonic()
+
+        if entry is not None and now - entry.checked < self.check_interval:
+            return entry
+
+        mtime = os.stat(folder).st_mtime
+
+        if entry is None or entry.mtime != mtime:
+            entry = self._scan(folder, mtime)
+            self._folders[folder] = entry
+
+        entry.checked = now
+        return entry
+
+    def get_files(self, folder: str) -> list[str]:
+        return self.get_folder(folder).files
+
+    def choice(self, folder: str) -> str:
+        return random.choice(self.get_files(folder))
+
+
+sound_library = SoundLibrary()
+
+
 def add_sound(state: bool, trigger: TriggerCalcResult, frame: int):
     if state:
         return
 
     scene = bpy.context.scene
-    
+
     folder = bpy.path.abspath(trigger.trigger.path)
-    files = []
-    for file in os.scandir(folder):
-        files.append(file.path)
     s = scene.sequence_editor.strips
-    s.new_sound(trigger.name, random.choice(files), 3, frame - 1)
+    s.new_sound(trigger.name, sound_library.choice(folder), 3, frame - 1)
+
+
+class TriggerIndex:
+    """KDTree over trigger centers, rebuilt only when triggers move or change size"""
+    _key: tuple | None = None
+    _tree: KDTree | None = None
+    _max_radius: float = 0
+
+    def update(self, spheres: list[tuple[Vector, float]]):
+        key = tuple((pos.to_tuple(), radius) for pos, radius in spheres)
+
+        if key == self._key:
+            return
+
+        tree = KDTree(len(spheres))
+        for index, (pos, radius) in enumerate(spheres):
+            tree.insert(pos, index)
+        tree.balance()
+
+        self._key = key
+        self._tree = tree
+        self._max_radius = max((radius for _, radius in spheres), default=0)
+
+    def find(self, pos: Vector) -> list[tuple[Vector, int, float]]:
+        if self._tree is None or self._max_radius <= 0:
+            return []
+
+        return self._tree.find_range(pos, self._max_radius)
+
+
+trigger_index = TriggerIndex()
 
 
 def calc_triggers():
     scene = bpy.context.scene
-    triggered_list = []
+    triggers: list[AudioTrigger] = list(scene.zenu_at)
+    points: list[AudioTriggerPoint] = list(scene.zenu_at_point)
+
+    spheres = [
+        (trigger.obj.matrix_world.translation.copy(), sum(trigger.obj.scale) / 3)
+        for trigger in triggers
+    ]
+    trigger_index.update(spheres)
 
-    for trigger in scene.zenu_at:
-        trigger: AudioTrigger
-        trigger_obj: bpy.types.Object = trigger.obj
-        radius = sum(trigger_obj.scale) / 3
+    # First point inside each trigger, points are checked in list order
+    hits: list[int | None] = [None] * len(triggers)
+    remaining = len(triggers)
 
-        is_triggered = False
+    for point_index, point in enumerate(points):
+        if not remaining:
+            break
 
-        triggered = TriggerCalcResult(
+        for _, index, dist in trigger_index.find(point.obj.matrix_world.translation):
+            if hits[index] is None and dist < spheres[index][1]:
+                hits[index] = point_index
+                remaining -= 1
+
+    triggered_list = []
+
+    for trigger, (_, radius), hit in zip(triggers, spheres, hits):
+        triggered_list.append(TriggerCalcResult(
             trigger=trigger,
             radius=radius,
-            is_triggered=is_triggered
-        )
+            is_triggered=hit is not None,
+            points=points[:len(points) if hit is None else hit + 1]
+        ))
 
-        for point in scene.zenu_at_point:
-            pos1 = point.obj.matrix_world.translation
-            pos2 = trigger_obj.matrix_world.translation
+    return triggered_list
 
-            diff = pos1 - pos2
 
-            is_triggered = abs(diff.length) < radius
-            triggered.points.append(point)
+def sample_trajectories(scene: bpy.types.Scene, frames: range):
+    """Point positions (F, P, 3), trigger centers (F, T, 3) and radii (F, T) in one pass over frames"""
+    triggers = [t.obj for t in scene.zenu_at]
+    points = [p.obj for p in scene.zenu_at_point]
 
-            if is_triggered:
-                break
+    point_pos = np.zeros((len(frames), len(points), 3))
+    trigger_pos = np.zeros((len(frames), len(triggers), 3))
+    radii = np.zeros((len(frames), len(triggers)))
 
-        triggered.is_triggered = is_triggered
-        triggered_list.append(triggered)
+    frame_current = scene.frame_current
 
-    return triggered_list
+    for index, frame in enumerate(frames):
+        scene.frame_set(frame)
+
+        for i, obj in enumerate(points):
+            point_pos[index, i] = obj.matrix_world.translation
+        for i, obj in enumerate(triggers):
+            trigger_pos[index, i] = obj.matrix_world.translation
+            radii[index, i] = sum(obj.scale) / 3
+
+    scene.frame_set(frame_current)
+
+    return point_pos, trigger_pos, radii
+
+
+def scan_triggers(point_pos: np.ndarray, trigger_pos: np.ndarray, radii: np.ndarray, chunk: int = 256):
+    """Trigger states (F, T), trigger is active when any point is strictly inside its radius"""
+    states = np.zeros(radii.shape, dtype=bool)
+
+    if not point_pos.shape[1] or not trigger_pos.shape[1]:
+        return states
+
+    for start in range(0, len(radii), chunk):
+        end = start + chunk
+        diff = point_pos[start:end, None, :, :] - trigger_pos[start:end, :, None, :]
+        dist = np.sqrt(np.einsum('ftpi,ftpi->ftp', diff, diff))
+        states[start:end] = (dist < radii[start:end, :, None]).any(axis=2)
+
+    return states
+
+
+def find_enter_frames(states: np.ndarray, frames: range) -> list[tuple[int, int]]:
+    """(frame, trigger index) for every frame where trigger became active"""
+    entered = ~states[:-1] & states[1:]
+    frame_index, trigger_index = np.nonzero(entered)
+
+    return [(frames[f + 1], int(t)) for f, t in zip(frame_index, trigger_index)]
 
 
 def get_active_trigger_index():
@@ -3,8 +3,9 @@ import subprocess
 import bpy
 from nodeitems_utils import NodeCategory
 
-from . import sockets, nodes, node_categories
+from . import sockets, nodes, node_categories, evaluation_cache
 from .graph_executor import GraphExecutor
+from .execution_plan import plan_cache
 from .utils import get_registers
 from ...base_panel import BasePanel
 
@@ -62,6 +63,8 @@ class ExportNodeTree(bpy.types.NodeTree):
         if not hasattr(self, "nodes"):
             return
 
+        plan_cache.invalidate(self)
+
         for node in self.nodes:
             for socket in node.inputs:
                 for link in socket.links:
@@ -106,6 +109,7 @@ def register():
     nodes_file.register()
     sockets.register()
     node_categories.register()
+    evaluation_cache.register()
 
 
 def unregister():  # dd
@@ -114,4 +118,5 @@ def unregister():  # dd
 
     sockets.unregister()
     node_categories.unregister()
+    evaluation_cache.unregister()
     # nodeitems_utils.unregister_node_categories("MY_NODES")
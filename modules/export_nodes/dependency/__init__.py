@@ -11,6 +11,10 @@ import bpy
 from ..nodes import BaseNode
 from ..sockets.armature_socket import ArmatureSocketResponse
 from ..utils import activate_animation
+from .farm import ExportFarm
+from .fingerprint import content_hash
+
+BUILD_CACHE_FILE = 'build_cache.json'
 
 
 def make_serializable(obj):
@@ -42,6 +46,9 @@ class DepType(Enum):
 class Dependency:
     users: set[bpy.types.Node]
     meta_per_node: dict[bpy.types.Node, dict[str, any]]
+    export_name: str | None = None
+    _meta: dict[str, any]
+    _meta_hash: str | None = None
 
     def __init__(self, dep_type: DepType, resource: Any, node: bpy.types.Node, meta: dict[str, any] = None):
         self.type = dep_type
@@ -67,9 +74,21 @@ class Dependency:
                 self.resource is other.resource
         )
 
+    @property
+    def meta(self):
+        return self._meta
+
+    @meta.setter
+    def meta(self, value: dict[str, any]):
+        self._meta = value
+        self._meta_hash = None
+
     @property
     def meta_hash(self):
-        return normalize_meta(self.meta)
+        if self._meta_hash is None:
+            self._meta_hash = normalize_meta(self._meta)
+
+        return self._meta_hash
 
     @property
     def key(self):
@@ -78,9 +97,11 @@ class Dependency:
 
 class DependencyCollection:
     _deps: dict[Any, Dependency]
+    _by_node: dict[bpy.types.Node, list[Dependency]]
 
     def __init__(self):
         self._deps = {}
+        self._by_node = {}
 
     def add_dep(self, dep: Dependency | list[Dependency]):
         if isinstance(dep, list):
@@ -95,18 +116,16 @@ class DependencyCollection:
             self._deps[key] = dep
 
         d = self._deps[key]
-        d.users.add(dep.node)
+
+        if dep.node not in d.users:
+            d.users.add(dep.node)
+            self._by_node.setdefault(dep.node, []).append(d)
 
     def get_deps(self):
         return tuple(self._deps.values())
 
     def get_by_node(self, node: BaseNode):
-        deps: list[Dependency] = []
-
-        for dep in self._deps.values():
-            if node in dep.users:
-                deps.append(dep)
-        return deps
+        return list(self._by_node.get(node, ()))
 
 
 class DependencyExporter:
@@ -114,6 +133,10 @@ class DependencyExporter:
         self._folder = folder
         self._deps = deps
 
+    @property
+    def folder(self):
+        return self._folder
+
     @staticmethod
     def get_slot(action: bpy.types.Action, slot_name: str):
         for sl in action.slots:
@@ -282,6 +305,9 @@ class DependencyExporter:
         }
 
     def get_name(self, dep: Dependency):
+        if dep.export_name is not None:
+            return dep.export_name
+
         name = getattr(dep.resource, "name", None)
         base = f"{dep.type.name}_{dep.meta_hash[:6]}_{name or id(dep.resource)}"
 
@@ -302,25 +328,108 @@ class DependencyExporter:
         with open(os.path.join(self._folder, 'mainfest.json'), mode='w') as fs:
             fs.write(data)
 
-    def export(self):
-        folder = os.path.join(self._folder, 'assets')
-        result = {}
-        if os.path.exists(folder):
-            shutil.rmtree(folder)
-
-        os.mkdir(folder)
-
+    def export_dep(self, dep: Dependency):
         handlers = {
             DepType.ANIMATION: self._export_animation,
             DepType.SOUND: self._export_sound,
         }
 
-        for dep in self._deps.get_deps():
-            if not dep.resource:
+        if not dep.resource:
+            return None
+
+        handler = handlers.get(dep.type)
+        if handler:
+            return handler(dep)
+
+        return None
+
+    def get_content_hash(self, dep: Dependency):
+        return content_hash(dep.type.name, dep.meta_hash, dep.resource, dep.meta)
+
+    def load_build_cache(self) -> dict[str, Any]:
+        path = os.path.join(self._folder, BUILD_CACHE_FILE)
+
+        if not os.path.exists(path):
+            return {}
+
+        try:
+            with open(path) as fs:
+                return json.loads(fs.read())
+        except (OSError, ValueError):
+            return {}
+
+    def save_build_cache(self, cache: dict[str, Any]):
+        with open(os.path.join(self._folder, BUILD_CACHE_FILE), mode='w') as fs:
+            fs.write(json.dumps(cache, indent=2))
+
+    @staticmethod
+    def remove_stale(folder: str, names: set[str]):
+        """Remove asset files which do not belong to any current dependency"""
+        for file in os.listdir(folder):
+            path = os.path.join(folder, file)
+
+            if os.path.isfile(path) and os.path.splitext(file)[0] not in names:
+                os.remove(path)
+
+    def export(self, workers: int = 1, incremental: bool = True):
+        folder = os.path.join(self._folder, 'assets')
+
+        if not incremental and os.path.exists(folder):
+            shutil.rmtree(folder)
+
+        os.makedirs(folder, exist_ok=True)
+
+        cache = self.load_build_cache() if incremental else {}
+        files = {os.path.splitext(i)[0] for i in os.listdir(folder)}
+        deps = [dep for dep in self._deps.get_deps() if dep.resource]
+
+        names = {}
+        hashes = {}
+        pending = []
+        for dep in deps:
+            name = self.get_name(dep)
+            names[dep] = name
+            hashes[name] = self.get_content_hash(dep)
+
+            entry = cache.get(name)
+            if (
+                    entry is not None
+                    and entry.get('hash') == hashes[name]
+                    and (entry['result'].get('path') is None or name in files)
+            ):
                 continue
 
-            handler = handlers.get(dep.type)
-            if handler:
-                result[self.get_name(dep)] = handler(dep)
+            pending.append(dep)
+
+        pending_names = {names[dep] for dep in pending}
+        print(f"[EXPORT] {len(pending)} changed, {len(deps) - len(pending)} up to date")
+
+        if workers > 1:
+            exported = ExportFarm(self, workers).export(pending)
+        else:
+            exported = {}
+            for dep in pending:
+                value = self.export_dep(dep)
+
+                if value is not None:
+                    exported[names[dep]] = value
+
+        result = {}
+        new_cache = {}
+        for dep in deps:
+            name = names[dep]
+
+            if name in exported:
+                value = exported[name]
+            elif name not in pending_names:
+                value = cache[name]['result']
+            else:
+                continue
+
+            result[name] = value
+            new_cache[name] = {'hash': hashes[name], 'result': value}
+
+        self.remove_stale(folder, set(result))
+        self.save_build_cache(new_cache)
 
         return result
@@ -0,0 +1,84 @@
+"""DependencyCollection benchmark
+
+blender --background --factory-startup --python modules/export_nodes/dependency/benchmark.py -- --sizes 1000 10000
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+PACKAGE = os.path.basename(ROOT)
+
+sys.path.insert(0, os.path.dirname(ROOT))
+dependency = importlib.import_module(f'{PACKAGE}.modules.export_nodes.dependency')
+
+
+class Resource:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class LegacyDependency(dependency.Dependency):
+    """Meta hash recalculated on every key access, as before the cache"""
+
+    @property
+    def meta_hash(self):
+        return dependency.normalize_meta(self.meta)
+
+
+def legacy_get_by_node(deps: 'dependency.DependencyCollection', node):
+    return [dep for dep in deps.get_deps() if node in dep.users]
+
+
+def build(dep_class: type, size: int, nodes: list[str]):
+    resources = [Resource(f'Action_{i}') for i in range(size)]
+    deps = []
+
+    for index, resource in enumerate(resources):
+        node = nodes[index % len(nodes)]
+        meta = {
+            'type': ('idle', 'enter')[index % 2],
+            'armatures': [f'Armature_{index % 8}', f'Slot_{index % 3}'],
+        }
+        deps.append(dep_class(dependency.DepType.ANIMATION, resource, node, meta=meta))
+
+    return deps
+
+
+def run(size: int, dep_class: type, get_by_node) -> dict[str, float]:
+    nodes = [f'Node_{i}' for i in range(max(1, size // 4))]
+    deps = build(dep_class, size, nodes)
+
+    start = time.perf_counter()
+    collection = dependency.DependencyCollection()
+    for dep in deps:
+        collection.add_dep(dep)
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for node in nodes:
+        get_by_node(collection, node)
+    lookup_time = time.perf_counter() - start
+
+    return {'add_dep': add_time, 'get_by_node': lookup_time}
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=(1000, 5000, 10000))
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        legacy = run(size, LegacyDependency, legacy_get_by_node)
+        indexed = run(size, dependency.Dependency, dependency.DependencyCollection.get_by_node)
+
+        for name in legacy:
+            print(f'{size:>6} {name:<12} legacy {legacy[name]:.4f}s  indexed {indexed[name]:.4f}s  '
+                  f'x{legacy[name] / max(indexed[name], 1e-9):.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING, Any, Callable
+
+import bpy
+
+from ....worker_pool import WorkerPool
+from ..sockets.armature_socket import ArmatureSocketResponse
+
+if TYPE_CHECKING:
+    from . import Dependency, DependencyExporter
+
+WORKER_ENTRY = 'modules.export_nodes.dependency.farm:export_jobs'
+
+
+def serialize_dep(dep: 'Dependency', name: str) -> dict[str, Any]:
+    armatures: list[ArmatureSocketResponse] = dep.meta.get('armatures') or []
+
+    return {
+        'type': dep.type.name,
+        'resource': getattr(dep.resource, 'name', None),
+        'name': name,
+        'meta_type': dep.meta.get('type'),
+        'armatures': [(i.armature.name, i.action_slot_name) for i in armatures],
+    }
+
+
+def deserialize_dep(data: dict[str, Any]) -> 'Dependency':
+    from . import Dependency, DepType
+
+    dep_type = DepType[data['type']]
+    resource = None
+
+    if dep_type == DepType.ANIMATION:
+        resource = bpy.data.actions.get(data['resource'])
+    elif dep_type == DepType.SOUND:
+        resource = bpy.data.sounds.get(data['resource'])
+
+    dep = Dependency(dep_type, resource, None, meta={
+        'type': data['meta_type'],
+        'armatures': [
+            ArmatureSocketResponse(bpy.data.objects[arm], slot)
+            for arm, slot in data['armatures']
+        ]
+    })
+    dep.export_name = data['name']
+
+    return dep
+
+
+def export_jobs(data: dict[str, Any], progress: Callable[[str], None]) -> dict[str, Any]:
+    """Worker side of ExportFarm"""
+    from . import DependencyExporter
+
+    exporter = DependencyExporter(data['folder'], None)
+    result = {}
+
+    for job in data['jobs']:
+        value = exporter.export_dep(deserialize_dep(job))
+
+        if value is not None:
+            result[job['name']] = value
+
+        progress(job['name'])
+
+    return result
+
+
+class ExportFarm:
+    """Export dependencies in background Blender processes from a saved snapshot of current file"""
+    _exporter: 'DependencyExporter'
+    _workers: int
+
+    def __init__(self, exporter: 'DependencyExporter', workers: int):
+        self._exporter = exporter
+        self._workers = max(1, workers)
+
+    def export(self, deps: list['Dependency']) -> dict[str, Any]:
+        exporter = self._exporter
+        jobs = [serialize_dep(dep, exporter.get_name(dep)) for dep in deps]
+        workers = min(self._workers, len(jobs))
+
+        results = WorkerPool(WORKER_ENTRY, 'Export').run([
+            {'folder': exporter.folder, 'jobs': jobs[index::workers]}
+            for index in range(workers)
+        ])
+
+        merged = {}
+        for result in results:
+            merged.update(result)
+
+        # Same order as serial export
+        return {job['name']: merged[job['name']] for job in jobs if job['name'] in merged}
@@ -0,0 +1,103 @@
+import os
+from hashlib import sha1
+from typing import Any
+
+import numpy as np
+import bpy
+
+# Bump when exported files change for the same input data
+FINGERPRINT_VERSION = 1
+
+
+def _update_array(hasher: 'sha1', collection: Any, attr: str, size: int, dtype=np.float32):
+    data = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(attr, data)
+    hasher.update(data.tobytes())
+
+
+def _iter_action_fcurves(action: bpy.types.Action):
+    layers = getattr(action, 'layers', None)
+
+    if not layers:
+        yield from action.fcurves
+        return
+
+    for layer in layers:
+        for strip in layer.strips:
+            for channelbag in strip.channelbags:
+                yield from channelbag.fcurves
+
+
+def update_action(hasher: 'sha1', action: bpy.types.Action):
+    hasher.update(f'{action.name}|{action.use_frame_range}|{tuple(action.frame_range)}'.encode())
+
+    for slot in getattr(action, 'slots', ()):
+        hasher.update(slot.identifier.encode())
+
+    for curve in _iter_action_fcurves(action):
+        hasher.update(f'{curve.data_path}|{curve.array_index}|{curve.mute}'.encode())
+
+        points = curve.keyframe_points
+        _update_array(hasher, points, 'co', 2)
+        _update_array(hasher, points, 'handle_left', 2)
+        _update_array(hasher, points, 'handle_right', 2)
+        _update_array(hasher, points, 'interpolation', 1, np.int32)
+
+
+def update_armature(hasher: 'sha1', armature: bpy.types.Armature):
+    bones = armature.bones
+    hasher.update('|'.join(f'{b.name}>{b.parent.name if b.parent else ""}' for b in bones).encode())
+    _update_array(hasher, bones, 'matrix_local', 16)
+    _update_array(hasher, bones, 'use_deform', 1, np.int32)
+
+
+def update_mesh(hasher: 'sha1', mesh: bpy.types.Mesh):
+    _update_array(hasher, mesh.vertices, 'co', 3)
+    _update_array(hasher, mesh.polygons, 'loop_total', 1, np.int32)
+    _update_array(hasher, mesh.loops, 'vertex_index', 1, np.int32)
+
+
+def update_object(hasher: 'sha1', obj: bpy.types.Object):
+    hasher.update(f'{obj.name}|{obj.type}'.encode())
+    hasher.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+
+    if obj.type == 'ARMATURE':
+        update_armature(hasher, obj.data)
+    elif obj.type == 'MESH':
+        update_mesh(hasher, obj.data)
+        hasher.update('|'.join(i.name for i in obj.vertex_groups).encode())
+
+
+def update_sound(hasher: 'sha1', sound: bpy.types.Sound):
+    path = bpy.path.abspath(sound.filepath)
+    hasher.update(path.encode())
+
+    if os.path.exists(path):
+        stat = os.stat(path)
+        hasher.update(f'{stat.st_size}|{stat.st_mtime_ns}'.encode())
+
+
+def update_resource(hasher: 'sha1', resource: Any):
+    if isinstance(resource, bpy.types.Action):
+        update_action(hasher, resource)
+    elif isinstance(resource, bpy.types.Object):
+        update_object(hasher, resource)
+    elif isinstance(resource, bpy.types.Armature):
+        update_armature(hasher, resource)
+    elif isinstance(resource, bpy.types.Mesh):
+        update_mesh(hasher, resource)
+    elif isinstance(resource, bpy.types.Sound):
+        update_sound(hasher, resource)
+    else:
+        hasher.update(repr(resource).encode())
+
+
+def content_hash(dep_type: str, meta_hash: str, resource: Any, meta: dict[str, Any]) -> str:
+    hasher = sha1(f'{FINGERPRINT_VERSION}|{dep_type}|{meta_hash}'.encode())
+    update_resource(hasher, resource)
+
+    for arm in meta.get('armatures') or ():
+        hasher.update(arm.action_slot_name.encode())
+        update_object(hasher, arm.armature)
+
+    return hasher.hexdigest()
@@ -0,0 +1,172 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .execution_plan import PlanInput, plan_cache
+
+id_revisions: dict[int, int] = defaultdict(int)
+_base_node_props: set[str] = set()
+
+
+def fingerprint_value(value: Any):
+    if value is None or isinstance(value, (int, float, str, bool)):
+        return value
+
+    if isinstance(value, bpy.types.ID):
+        return 'ID', value.session_uid, id_revisions[value.session_uid]
+
+    if isinstance(value, bpy.types.bpy_struct):
+        return 'STRUCT', value.as_pointer()
+
+    if isinstance(value, dict):
+        return tuple((k, fingerprint_value(v)) for k, v in value.items())
+
+    try:
+        return tuple(fingerprint_value(i) for i in value)
+    except TypeError:
+        return repr(value)
+
+
+def fingerprint_node(node: bpy.types.Node):
+    if not _base_node_props:
+        _base_node_props.update(i.identifier for i in bpy.types.Node.bl_rna.properties)
+
+    return tuple(
+        (prop.identifier, fingerprint_value(getattr(node, prop.identifier, None)))
+        for prop in node.bl_rna.properties
+        if prop.identifier not in _base_node_props
+    )
+
+
+@dataclass
+class CacheEntry:
+    props: tuple
+    inputs: tuple
+    outputs: Any
+    version: int
+
+
+class EvaluationCache:
+    hits: int = 0
+    misses: int = 0
+    _entries: dict[str, CacheEntry]
+    _version: int = 0
+
+    def __init__(self):
+        self._entries = {}
+
+    def get_version(self, node_name: str) -> int:
+        entry = self._entries.get(node_name)
+
+        if entry is None:
+            return -1
+
+        return entry.version
+
+    def fingerprint_inputs(self, node: bpy.types.Node, plan_inputs: tuple[PlanInput, ...]):
+        result = []
+
+        for plan_input in plan_inputs:
+            if not plan_input.links:
+                value = None
+                if plan_input.has_value:
+                    value = node.inputs[plan_input.index].value
+
+                result.append((plan_input.name, fingerprint_value(value)))
+                continue
+
+            result.append((plan_input.name, tuple(
+                (from_node, from_socket, self.get_version(from_node))
+                for from_node, from_socket in plan_input.links
+            )))
+
+        return tuple(result)
+
+    def get(self, node: bpy.types.Node, plan_inputs: tuple[PlanInput, ...]):
+        """Cached outputs if node, its upstream and referenced datablocks did not change"""
+        entry = self._entries.get(node.name)
+
+        if (
+                entry is None
+                or not getattr(node, 'cacheable', False)
+                or entry.inputs != self.fingerprint_inputs(node, plan_inputs)
+                or entry.props != fingerprint_node(node)
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def store(self, node: bpy.types.Node, outputs: Any, plan_inputs: tuple[PlanInput, ...]):
+        self._version += 1
+
+        # Props are read after compute, nodes like Print write into their own properties
+        self._entries[node.name] = CacheEntry(
+            props=fingerprint_node(node),
+            inputs=self.fingerprint_inputs(node, plan_inputs),
+            outputs=outputs,
+            version=self._version
+        )
+
+    def invalidate(self, node: bpy.types.Node = None):
+        if node is None:
+            self._entries.clear()
+            return
+
+        self._entries.pop(node.name, None)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+evaluation_caches: dict[int, EvaluationCache] = {}
+
+
+def get_evaluation_cache(tree: bpy.types.NodeTree) -> EvaluationCache:
+    cache = evaluation_caches.get(tree.session_uid)
+
+    if cache is None:
+        cache = EvaluationCache()
+        evaluation_caches[tree.session_uid] = cache
+
+    return cache
+
+
+@persistent
+def track_id_revisions(scene, depsgraph: bpy.types.Depsgraph):
+    for update in depsgraph.updates:
+        id_revisions[update.id.original.session_uid] += 1
+
+
+@persistent
+def clear_evaluation_caches(dummy):
+    evaluation_caches.clear()
+    id_revisions.clear()
+    plan_cache.clear()
+
+
+# Undo and redo restore older trees without calling NodeTree.update
+CLEAR_HANDLERS = (
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(track_id_revisions)
+
+    for handler in CLEAR_HANDLERS:
+        handler.append(clear_evaluation_caches)
+
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(track_id_revisions)
+
+    for handler in CLEAR_HANDLERS:
+        handler.remove(clear_evaluation_caches)
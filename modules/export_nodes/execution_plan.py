@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Callable
+
+import bpy
+
+
+@dataclass
+class PlanInput:
+    index: int
+    name: str
+    links: tuple[tuple[str, str], ...]
+    is_multi_input: bool
+    has_value: bool
+
+
+@dataclass
+class ExecutionPlan:
+    order: tuple[str, ...]
+    inputs: dict[str, tuple[PlanInput, ...]]
+
+
+def topology_hash(tree: bpy.types.NodeTree) -> int:
+    return hash((
+        tuple(
+            (node.name, tuple(s.identifier for s in node.inputs), tuple(s.identifier for s in node.outputs))
+            for node in tree.nodes
+        ),
+        tuple(
+            (l.from_node.name, l.from_socket.identifier, l.to_node.name, l.to_socket.identifier)
+            for l in tree.links
+        ),
+    ))
+
+
+def compile_inputs(node: bpy.types.Node) -> tuple[PlanInput, ...]:
+    return tuple(
+        PlanInput(
+            index=index,
+            name=socket.name,
+            links=tuple((l.from_node.name, l.from_socket.name) for l in socket.links),
+            is_multi_input=socket.is_multi_input,
+            has_value=hasattr(socket, 'value')
+        )
+        for index, socket in enumerate(node.inputs)
+    )
+
+
+class PlanCache:
+    hits: int = 0
+    misses: int = 0
+    _hashes: dict[int, int | None]
+    _plans: dict[int, tuple[int, dict[tuple, ExecutionPlan]]]
+
+    def __init__(self):
+        self._hashes = {}
+        self._plans = {}
+
+    def invalidate(self, tree: bpy.types.NodeTree):
+        """Tree topology changed, hash will be recalculated on next get"""
+        self._hashes[tree.session_uid] = None
+
+    def clear(self):
+        self._hashes.clear()
+        self._plans.clear()
+
+    def get(self, tree: bpy.types.NodeTree, key: tuple, build: Callable[[], ExecutionPlan]) -> ExecutionPlan:
+        uid = tree.session_uid
+        tree_hash = self._hashes.get(uid)
+
+        if tree_hash is None:
+            tree_hash = topology_hash(tree)
+            self._hashes[uid] = tree_hash
+
+        plans_hash, plans = self._plans.get(uid, (None, None))
+
+        if plans is None or plans_hash != tree_hash:
+            plans = {}
+            self._plans[uid] = tree_hash, plans
+
+        plan = plans.get(key)
+
+        if plan is not None:
+            self.hits += 1
+            return plan
+
+        self.misses += 1
+        plan = build()
+        plans[key] = plan
+        return plan
+
+
+plan_cache = PlanCache()
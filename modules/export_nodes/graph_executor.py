@@ -2,6 +2,9 @@ from collections import defaultdict, deque
 from typing import Any, Iterable, Tuple
 import bpy
 
+from .evaluation_cache import EvaluationCache, get_evaluation_cache
+from .execution_plan import ExecutionPlan, PlanInput, compile_inputs, plan_cache
+
 
 class GraphExecutionDirection:
     FORWARD = 'FORWARD'
@@ -9,9 +12,13 @@ class GraphExecutionDirection:
 
 
 class GraphExecutor:
-    def __init__(self, node_tree: bpy.types.NodeTree):
+    cache: EvaluationCache | None
+
+    def __init__(self, node_tree: bpy.types.NodeTree, use_cache: bool = True):
         self.tree = node_tree
         self.context: dict[bpy.types.Node, dict[str, Any]] = {}
+        self._outputs: dict[str, dict[str, Any]] = {}
+        self.cache = get_evaluation_cache(node_tree) if use_cache else None
 
     @staticmethod
     def collect_subgraph(start_node, sockets_exactly=None, direction=GraphExecutionDirection.BACKWARD):
@@ -121,7 +128,46 @@ class GraphExecutor:
 
         return {}
 
-    def execute(self, node: bpy.types.Node, sockets_exactly = None, direction=GraphExecutionDirection.BACKWARD):
+    def eval_planned_node(self, node, plan_inputs: tuple[PlanInput, ...]):
+        inputs = {}
+
+        for plan_input in plan_inputs:
+            if not plan_input.links:
+                if plan_input.has_value:
+                    inputs[plan_input.name] = node.inputs[plan_input.index].value
+                continue
+
+            values = [
+                self._outputs[from_node].get(from_socket) if from_node in self._outputs else None
+                for from_node, from_socket in plan_input.links
+            ]
+
+            value = values if plan_input.is_multi_input else values[0]
+
+            if value is None:
+                continue
+
+            inputs[plan_input.name] = value
+
+        if hasattr(node, "compute"):
+            return node._pre_compute(**{**inputs, '_context': self.context})
+
+        return {}
+
+    def eval_node_cached(self, node, plan_inputs: tuple[PlanInput, ...]):
+        if self.cache is None:
+            return self.eval_planned_node(node, plan_inputs)
+
+        entry = self.cache.get(node, plan_inputs)
+
+        if entry is not None:
+            return entry.outputs
+
+        outputs = self.eval_planned_node(node, plan_inputs)
+        self.cache.store(node, outputs, plan_inputs)
+        return outputs
+
+    def compile(self, node: bpy.types.Node, sockets_exactly=None, direction=GraphExecutionDirection.BACKWARD):
         sub_nodes = self.collect_subgraph(node, sockets_exactly=sockets_exactly, direction=direction)
         links = self.build_links_for_subgraph(sub_nodes)
 
@@ -129,7 +175,32 @@ class GraphExecutor:
 
         order = self.topo_sort(deps, forward)
 
-        for n in order:
-            self.context[n] = self.eval_node(n)
+        return ExecutionPlan(
+            order=tuple(n.name for n in order),
+            inputs={n.name: compile_inputs(n) for n in order}
+        )
+
+    def get_plan(self, node: bpy.types.Node, sockets_exactly=None, direction=GraphExecutionDirection.BACKWARD):
+        sockets_key = None
+
+        if sockets_exactly is not None:
+            sockets_key = tuple((s.node.name, s.identifier, s.is_output) for s in sockets_exactly)
+
+        return plan_cache.get(
+            self.tree,
+            (node.name, sockets_key, direction),
+            lambda: self.compile(node, sockets_exactly, direction)
+        )
+
+    def execute(self, node: bpy.types.Node, sockets_exactly = None, direction=GraphExecutionDirection.BACKWARD):
+        plan = self.get_plan(node, sockets_exactly, direction)
+        nodes = self.tree.nodes
+
+        for name in plan.order:
+            n = nodes[name]
+            outputs = self.eval_node_cached(n, plan.inputs[name])
+
+            self.context[n] = outputs
+            self._outputs[name] = outputs
 
         return self.context
@@ -7,6 +7,7 @@ from ...utils import object_filter_static, ObjectTypes
 class ArmatureNode(BaseNode):
     bl_idname = "ArmatureNode"
     bl_label = "Armature"
+    cacheable = True
 
     armature: bpy.props.PointerProperty(type=bpy.types.Object, poll=object_filter_static(ObjectTypes.ARMATURE))
     animation_slot: bpy.props.StringProperty()
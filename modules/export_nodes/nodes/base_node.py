@@ -1,4 +1,5 @@
 import inspect
+from functools import cache
 from typing import Any
 
 import bpy
@@ -7,10 +8,17 @@ import bpy
 # from ..sockets import sockets
 
 
+@cache
+def compute_parameters(node_type: type) -> tuple[str, ...]:
+    return tuple(inspect.signature(node_type.compute).parameters)[1:]
+
+
 class BaseNode(bpy.types.Node):
     bl_idname = "BaseNode"
     bl_label = "Base Node"
     context: dict[Any, Any]
+    # Pure nodes opt in, their outputs are shared between executions and must not be mutated downstream
+    cacheable: bool = False
 
     def get_dependencies(self, ctx):
         return []
@@ -115,9 +123,7 @@ class SimpleNode(BaseNode):
         #     socket.hide_value = True
 
     def _pre_compute(self, **inputs):
-        sig = inspect.signature(self.compute)
-
-        for name, param in sig.parameters.items():
+        for name in compute_parameters(type(self)):
             if inputs.get(name) is None:
                 inputs[name] = self.inputs.get(name).value
 
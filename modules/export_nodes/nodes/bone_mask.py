@@ -3,6 +3,7 @@ from json import dumps, loads, JSONDecodeError
 
 import bpy
 from .base_node import BaseNode
+from ...armature_index import armature_index
 from .. import node_categories
 from ..sockets.mask_socket import MaskTypeSocket
 from ..utils import object_filter_static, ObjectTypes
@@ -45,11 +46,7 @@ class BoneMask(BaseNode):
     bone_mask: bpy.props.StringProperty()
 
     def get_armature(self, obj: bpy.types.Object) -> bpy.types.Object | None:
-        for mod in obj.modifiers:
-            mod: bpy.types.Modifier
-            if mod.type != 'ARMATURE': continue
-            return mod.object
-        return None
+        return armature_index.get_armature(obj)
 
     @property
     def armature(self):
@@ -10,6 +10,7 @@ from ..utils import object_filter_static, ObjectTypes
 class CharacterEquip(BaseNode):
     bl_idname = "CharacterEquip"
     bl_label = "Character Equipment"
+    cacheable = True
 
     parent_type: bpy.props.EnumProperty(items=(
         ('BONE', 'Bone', ''),
@@ -113,7 +113,7 @@ class DialogStartNodeActions(ActionOperator):
 
         data = json.dumps({
             **comp.config_build(dep_export),
-            'deps': dep_export.export()
+            'deps': dep_export.export(node.export_workers, node.export_incremental)
         }, indent=2)
 
         print(data)
@@ -127,11 +127,18 @@ class DialogStartNode(BaseDialogNode):
     bl_label = "Dialog Start"
     dialog_type = 'start'
 
+    export_workers: bpy.props.IntProperty(name='Workers', default=1, min=1, soft_max=16,
+                                          description='Background Blender processes used for export')
+    export_incremental: bpy.props.BoolProperty(name='Incremental', default=True,
+                                               description='Skip dependencies whose content did not change since last export')
+
     def draw_buttons(self, context, layout):
         row = layout.row()
         op = DialogStartNodeActions.draw_action(row, DialogStartNodeActions.action_execute)
         op.node_system = self.id_data.name
         op.node = self.name
+        layout.prop(self, 'export_workers')
+        layout.prop(self, 'export_incremental')
 
     def init(self, context):
         self.outputs.new(DialogSocketType.bl_idname, 'dialog')
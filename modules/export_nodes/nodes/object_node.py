@@ -10,6 +10,7 @@ from ..sockets.object_socket import ObjectSocketType
 class ObjectNode(BaseNode):
     bl_idname = "ObjectNode"
     bl_label = "Object"
+    cacheable = True
 
     # bl_icon = 'INFO'
 
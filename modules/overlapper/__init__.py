@@ -5,6 +5,7 @@ from mathutils import Matrix, Vector, Quaternion
 from .transform_baker import add_empty
 from .verlet_physic import VerletPhysic
 from .context import ov_context
+from .bone import ov_bone_cache
 from .rotation_based_overlapper import RotationBasedOverlapper, RotationBasedOverlapperData
 from .overlapper_settings import OverlapperSettings
 from ...base_panel import BasePanel
@@ -139,7 +140,7 @@ class ZENU_OT_bake_transforms(bpy.types.Operator):
         if bpy.context.scene.use_preview_range:
             start, end = context.scene.frame_preview_start, context.scene.frame_preview_end
 
-        ov_context.baker.bake(start, end, offset)
+        ov_context.baker.bake(start, end, offset, ov_context.settings.bake_mode)
         return {'FINISHED'}
 
 
@@ -154,8 +155,10 @@ class ZENU_OT_overlapper_constraint(bpy.types.Operator):
     ))
 
     def execute(self, context: bpy.types.Context):
+        backend = ov_context.settings.key_backend
+
         if self.action == 'ADD':
-            ov_context.constraints.create_constraints()
+            ov_context.constraints.create_constraints(backend)
         elif self.action == 'REMOVE':
             ov_context.constraints.remove_constraints()
         elif self.action == 'BAKE_ACTION':
@@ -175,6 +178,13 @@ class ZENU_OT_overlapper_constraint(bpy.types.Operator):
 
             context.active_object.animation_data.action_blend_type = 'COMBINE'
             context.active_object.animation_data.action = action
+
+            if backend == 'DIRECT':
+                ov_context.constraints.bake_action(context.active_object, action)
+                ov_context.constraints.remove_constraints()
+                context.active_object.animation_data.action = prev_action
+                return {'FINISHED'}
+
             bpy.ops.nla.bake(frame_start=ov_context.baker.start,
                              frame_end=ov_context.baker.end,
                              visual_keying=True,
@@ -221,6 +231,8 @@ class ZENU_PT_overlapper(BasePanel):
         row.prop(settings, 'motion_multiply')
 
         col.prop(settings, 'bake_offset')
+        col.prop(settings, 'bake_mode', text='')
+        col.prop(settings, 'key_backend', text='')
 
         col = layout.row(align=True)
         col.scale_y = 1.5
@@ -267,6 +279,23 @@ def loop(dummy):
     # for frame in ov_context.baker.get_range_offset():
 
 
+@persistent
+def bone_cache_update(scene, depsgraph):
+    ov_bone_cache.on_depsgraph_update()
+
+
+@persistent
+def bone_cache_invalidate(*args):
+    ov_bone_cache.invalidate()
+
+
+INVALIDATE_HANDLERS = (
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+)
+
+
 reg, unreg = bpy.utils.register_classes_factory((
     ZENU_PT_overlapper,
     ZENU_OT_overlapper,
@@ -280,6 +309,9 @@ reg, unreg = bpy.utils.register_classes_factory((
 def register():
     reg()
     bpy.app.handlers.frame_change_post.append(loop)
+    bpy.app.handlers.depsgraph_update_post.append(bone_cache_update)
+    for handler in INVALIDATE_HANDLERS:
+        handler.append(bone_cache_invalidate)
     ov_context.visual.register()
 
     bpy.types.Scene.ov_settings = bpy.props.PointerProperty(
@@ -291,4 +323,7 @@ def register():
 def unregister():
     unreg()
     bpy.app.handlers.frame_change_post.remove(loop)
+    bpy.app.handlers.depsgraph_update_post.remove(bone_cache_update)
+    for handler in INVALIDATE_HANDLERS:
+        handler.remove(bone_cache_invalidate)
     ov_context.visual.unregister()
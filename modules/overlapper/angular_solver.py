@@ -1,6 +1,8 @@
 import math
 
+import numpy as np
 from mathutils import Quaternion, Vector
+from .np_math import quaternion_multiply
 
 
 class ZAngularSolverSettings:
@@ -34,4 +36,51 @@ class ZAngularSolver:
             q_step = Quaternion(axis_norm, speed * dt)
             q_current = q_step @ q_current
 
-        return q_current, angular_velocity
\ No newline at end of file
+        return q_current, angular_velocity
+
+    def solve_batch(self, q_current: np.ndarray, q_target: np.ndarray, angular_velocity: np.ndarray,
+                    stiffness: np.ndarray = None, damping: np.ndarray = None):
+        """Same as solve for N bones at once, quaternions (N, 4) wxyz, velocities (N, 3)"""
+        count, dt = q_current.shape[0], self.delta_time
+
+        if stiffness is None:
+            stiffness = self.settings.stiffness
+        if damping is None:
+            damping = self.settings.damping
+
+        stiffness = np.broadcast_to(np.asarray(stiffness, dtype=np.float64), (count,))
+        damping = np.broadcast_to(np.asarray(damping, dtype=np.float64), (count,))
+
+        flip = np.sum(q_current * q_target, axis=1) < 0.0
+        q_target = np.where(flip[:, None], -q_target, q_target)
+
+        q_delta = quaternion_multiply(q_target, q_current * (1, -1, -1, -1))
+        q_delta /= np.linalg.norm(q_delta, axis=1, keepdims=True)
+
+        half_angle = np.arccos(np.clip(q_delta[:, 0], -1, 1))
+        angle = half_angle * 2
+        angle = np.where(angle > math.pi, angle - 2 * math.pi, angle)
+
+        sin = np.sin(half_angle)
+        sin = np.where(np.abs(sin) < 0.0005, 1, sin)
+        axis = q_delta[:, 1:] / sin[:, None]
+
+        angular_velocity = angular_velocity + axis * (angle * stiffness * dt)[:, None]
+        angular_velocity *= np.exp(-damping * dt)[:, None]
+
+        speed = np.linalg.norm(angular_velocity, axis=1)
+        moving = speed > 1e-8
+
+        half_step = speed * dt * .5
+        q_step = np.zeros((count, 4))
+        q_step[:, 0] = np.cos(half_step)
+        q_step[moving, 1:] = angular_velocity[moving] / speed[moving, None]\
+            * np.sin(half_step[moving])[:, None]
+
+        q_current = np.where(
+            moving[:, None],
+            quaternion_multiply(q_step, q_current),
+            q_current
+        )
+
+        return q_current, angular_velocity
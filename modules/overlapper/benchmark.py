@@ -0,0 +1,296 @@
+"""Overlapper benchmark
+
+blender --background --factory-startup --python modules/overlapper/benchmark.py -- --output report.json
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+import types
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import bpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PACKAGE = 'zenu_benchmark'
+
+
+def load_module(name: str):
+    """Import add-on module without running package __init__ files, they register UI and need full Blender"""
+    package, path = PACKAGE, ROOT
+
+    for part in [None, *name.split('.')[:-1]]:
+        if part is not None:
+            package, path = f'{package}.{part}', os.path.join(path, part)
+
+        if package not in sys.modules:
+            module = types.ModuleType(package)
+            module.__path__ = [path]
+            sys.modules[package] = module
+
+    return importlib.import_module(f'{PACKAGE}.{name}')
+
+
+transform_baker = load_module('modules.overlapper.transform_baker')
+rotation_based_overlapper = load_module('modules.overlapper.rotation_based_overlapper')
+angular_solver = load_module('modules.overlapper.angular_solver')
+fcurve_writer = load_module('modules.overlapper.fcurve_writer')
+ov_bone = load_module('modules.overlapper.bone')
+
+
+@dataclass
+class BenchmarkSettings:
+    stiffness: float = 40
+    damping: float = 7
+    only_root_motion: bool = True
+    motion_multiply: float = 10
+    wind: tuple = (0, 0, 0)
+
+
+@dataclass
+class BenchmarkResult:
+    chains: int
+    bones: int
+    frames: int
+    timings: dict[str, float] = field(default_factory=dict)
+    bone_cache: dict[str, int] = field(default_factory=dict)
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ('git', 'rev-parse', 'HEAD'), cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def create_armature(chains: int, bones: int, frames: int) -> bpy.types.Object:
+    arm_data = bpy.data.armatures.new('OvBenchmark')
+    arm = bpy.data.objects.new('OvBenchmark', arm_data)
+    bpy.context.scene.collection.objects.link(arm)
+    bpy.context.view_layer.objects.active = arm
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    for chain in range(chains):
+        parent = None
+
+        for index in range(bones):
+            bone = arm_data.edit_bones.new(f'chain_{chain}_{index}')
+            bone.head = (chain, 0, index * .2)
+            bone.tail = (chain, 0, (index + 1) * .2)
+            bone.parent = parent
+            bone.use_connect = parent is not None
+            parent = bone
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    frame_range = np.arange(1, frames + 1, 5, dtype=np.float64)
+    writer = fcurve_writer.FCurveWriter(
+        fcurve_writer.ensure_channelbag(arm), frame_range)
+    time_line = frame_range / 24
+
+    for chain in range(chains):
+        bone = arm.pose.bones[f'chain_{chain}_0']
+        angle = np.sin(time_line * 2 + chain) * .5
+
+        writer.write(bone.path_from_id('location'), np.stack((
+            np.sin(time_line * 3 + chain),
+            np.cos(time_line * 2),
+            np.zeros(len(frame_range))
+        ), axis=1), group=bone.name)
+        writer.write(bone.path_from_id('rotation_quaternion'), np.stack((
+            np.cos(angle * .5),
+            np.sin(angle * .5),
+            np.zeros(len(frame_range)),
+            np.zeros(len(frame_range))
+        ), axis=1), group=bone.name)
+
+    return arm
+
+
+def clear_scene():
+    for obj in tuple(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+
+    for arm in tuple(bpy.data.armatures):
+        bpy.data.armatures.remove(arm)
+
+    for action in tuple(bpy.data.actions):
+        bpy.data.actions.remove(action)
+
+
+def clear_constraints(arm: bpy.types.Object, name: str):
+    for bone in arm.pose.bones:
+        constraint = bone.constraints.get(name)
+
+        if constraint is not None:
+            bone.constraints.remove(constraint)
+
+    for obj in tuple(bpy.data.objects):
+        if obj != arm:
+            bpy.data.objects.remove(obj)
+
+
+def fill_baker(baker, arm: bpy.types.Object, chains: int, bones: int):
+    baker.clear()
+
+    for chain in range(chains):
+        parent = None
+
+        for index in range(bones):
+            record = baker.add_bone(arm, arm.pose.bones[f'chain_{chain}_{index}'], parent)
+            record.index = index
+
+            if parent is None:
+                record.parent = record
+            else:
+                parent.child = record
+
+            parent = record
+
+        parent.child = parent
+
+
+def timeit(timings: dict[str, float], skip: list[str], name: str, func, *args):
+    if name in skip:
+        return
+
+    start = time.perf_counter()
+    func(*args)
+    timings[name] = time.perf_counter() - start
+
+
+def solver_deviation(count: int = 64, steps: int = 200) -> float:
+    rng = np.random.default_rng(0)
+    solver = angular_solver.ZAngularSolver()
+    Quaternion, Vector = angular_solver.Quaternion, angular_solver.Vector
+
+    def random_quats():
+        quats = rng.normal(size=(count, 4))
+        return quats / np.linalg.norm(quats, axis=1, keepdims=True)
+
+    stiffness = rng.uniform(5, 50, count)
+    damping = rng.uniform(1, 20, count)
+    current, velocity = random_quats(), np.zeros((count, 3))
+    scalar = [(Quaternion(q), Vector()) for q in current]
+    deviation = 0
+
+    for step in range(steps):
+        if step % 50 == 0:
+            target = random_quats()
+
+        current, velocity = solver.solve_batch(current, target, velocity, stiffness, damping)
+
+        for index, (q, vel) in enumerate(scalar):
+            solver.settings.stiffness = stiffness[index]
+            solver.settings.damping = damping[index]
+            q, vel = solver.solve(q, Quaternion(target[index]), vel)
+            scalar[index] = q, vel
+
+            deviation = max(
+                deviation,
+                1 - abs(float(np.dot(tuple(q), current[index]))),
+                float(np.abs(np.array(vel) - velocity[index]).max())
+            )
+
+    return deviation
+
+
+def run_case(chains: int, bones: int, frames: int, modes: list[str], skip: list[str]) -> BenchmarkResult:
+    result = BenchmarkResult(chains, bones, frames)
+    timings = result.timings
+
+    clear_scene()
+    ov_bone.ov_bone_cache.reset_stats()
+    arm = create_armature(chains, bones, frames)
+    baker = transform_baker.TransformBaker()
+    constraints = transform_baker.ConstraintCreator(baker)
+
+    for mode in modes:
+        fill_baker(baker, arm, chains, bones)
+        timeit(timings, skip, f'bake_{mode.lower()}', baker.bake, 1, frames, 0, mode)
+
+    solver = rotation_based_overlapper.RotationBasedOverlapper(baker, BenchmarkSettings())
+    timeit(timings, skip, 'calc', solver.calc)
+
+    # Each backend starts without empties and constraints of previous one
+    for backend in ('KEYFRAME_INSERT', 'DIRECT'):
+        timeit(timings, skip, f'keys_{backend.lower()}', constraints.create_constraints, backend)
+        clear_constraints(arm, constraints.CONST_NAME)
+
+    action = bpy.data.actions.new('OvBenchmarkBake')
+    timeit(timings, skip, 'bake_action_direct', constraints.bake_action, arm, action)
+
+    result.bone_cache = {
+        'hits': ov_bone.ov_bone_cache.hits,
+        'misses': ov_bone.ov_bone_cache.misses,
+    }
+    return result
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(prog='overlapper benchmark')
+    parser.add_argument('--output', default='overlapper_benchmark.json')
+    parser.add_argument('--chains', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--bones', type=int, nargs='+', default=[5, 20, 40])
+    parser.add_argument('--frames', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--modes', nargs='+', default=['SCENE', 'FCURVES'])
+    parser.add_argument('--skip', nargs='*', default=[], help='Timing names to skip, e.g. keys_keyframe_insert')
+    parser.add_argument('--compare', help='Previous report to print ratios against')
+
+    return parser.parse_args(argv)
+
+
+def print_compare(results: list[BenchmarkResult], path: str):
+    with open(path) as f:
+        old = {
+            (i['chains'], i['bones'], i['frames']): i['timings']
+            for i in json.load(f)['results']
+        }
+
+    for result in results:
+        old_timings = old.get((result.chains, result.bones, result.frames))
+
+        if old_timings is None:
+            continue
+
+        for name, value in result.timings.items():
+            if name in old_timings and old_timings[name] > 0:
+                print(f'{result.chains}x{result.bones}x{result.frames} {name}: '
+                      f'{value / old_timings[name]:.2f}x')
+
+
+def main():
+    args = parse_args()
+    results = []
+
+    for chains in args.chains:
+        for bones in args.bones:
+            for frames in args.frames:
+                result = run_case(chains, bones, frames, args.modes, args.skip)
+                results.append(result)
+                print(chains, bones, frames, {k: round(v, 4) for k, v in result.timings.items()})
+
+    report = {
+        'blender': bpy.app.version_string,
+        'commit': get_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'solver_deviation': solver_deviation(),
+        'results': [asdict(i) for i in results],
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        print_compare(results, args.compare)
+
+    clear_scene()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,109 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 from mathutils import Matrix
 import bpy
 
+
+class OvBoneCache:
+    """Bound structs are reused only while bake session is active, otherwise bones are looked up on every read"""
+    session: int = 0
+    active: bool = False
+    hits: int = 0
+    misses: int = 0
+    _object_uids: frozenset[int] = frozenset()
+
+    @staticmethod
+    def _get_object_uids() -> frozenset[int]:
+        return frozenset(i.session_uid for i in bpy.data.objects)
+
+    def begin_session(self):
+        self.session += 1
+        self.active = True
+        self._object_uids = self._get_object_uids()
+
+    def invalidate(self):
+        self.session += 1
+        self.active = False
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def on_depsgraph_update(self):
+        if not self.active:
+            return
+
+        # Removed object may be replaced by new one with same name, count alone misses that
+        object_uids = self._get_object_uids()
+
+        if not self._object_uids <= object_uids:
+            self.begin_session()
+
+        self._object_uids = object_uids
+
+
+ov_bone_cache = OvBoneCache()
+
+
 @dataclass
 class OvBone:
     armature_name: str
     bone_name: str
 
+    _arm: Optional[bpy.types.Object] = field(default=None, init=False, repr=False, compare=False)
+    _bone: Optional[bpy.types.PoseBone] = field(default=None, init=False, repr=False, compare=False)
+    _session: int = field(default=-1, init=False, repr=False, compare=False)
+
+    def _is_bound(self) -> bool:
+        if self._session != ov_bone_cache.session:
+            return False
+
+        try:
+            return self._arm.name == self.armature_name and self._bone.name == self.bone_name
+        except ReferenceError:
+            return False
+
+    def _resolve(self):
+        if not ov_bone_cache.active:
+            self._bind(-1)
+            return
+
+        if self._is_bound():
+            ov_bone_cache.hits += 1
+            return
+
+        ov_bone_cache.misses += 1
+        self._bind(ov_bone_cache.session)
+
+    def _bind(self, session: int):
+        self._arm = bpy.data.objects[self.armature_name]
+        self._bone = self._arm.pose.bones[self.bone_name]
+        self._session = session
+
     @property
     def arm(self):
-        return bpy.data.objects[self.armature_name]
+        self._resolve()
+        return self._arm
 
     @property
     def bone(self):
-        return self.arm.pose.bones[self.bone_name]
+        self._resolve()
+        return self._bone
 
     @property
     def matrix_world(self):
-        return self.arm.matrix_world @ self.bone.matrix
+        self._resolve()
+        return self._arm.matrix_world @ self._bone.matrix
 
     @property
     def matrix(self):
         return self.bone.matrix
-    
+
     @property
     def matrix_basis(self) -> Matrix:
         return self.bone.matrix_basis.copy()
-    
+
     def damped_track_to(self, name: str, target: bpy.types.Object):
         const: bpy.types.DampedTrackConstraint = self.bone.constraints.get(name)
 
@@ -36,5 +112,5 @@ class OvBone:
 
         const.name = name
         const.target = target
-        
-        return const
\ No newline at end of file
+
+        return const
@@ -0,0 +1,100 @@
+import numpy as np
+import bpy
+from bpy_extras import anim_utils
+
+from ...fcurve_utils import KEYFRAME_ARRAYS
+
+INTERPOLATION_BEZIER = 2
+
+
+def ensure_channelbag(obj: bpy.types.Object, action: bpy.types.Action = None):
+    anim_data = obj.animation_data
+
+    if anim_data is None:
+        anim_data = obj.animation_data_create()
+
+    if action is None:
+        action = anim_data.action
+
+    if action is None:
+        action = bpy.data.actions.new(obj.name)
+
+    if anim_data.action != action:
+        anim_data.action = action
+
+    slot = anim_data.action_slot
+
+    if slot is None:
+        slot = action.slots.new(obj.id_type, obj.name)
+        anim_data.action_slot = slot
+
+    return anim_utils.action_ensure_channelbag_for_slot(action, slot)
+
+
+class FCurveWriter:
+    """Write keys with foreach_set, keys outside of frames are kept with handles, easing and type"""
+    _channelbag: bpy.types.ActionChannelbag
+    _frames: np.ndarray
+
+    def __init__(self, channelbag: bpy.types.ActionChannelbag, frames: np.ndarray):
+        self._channelbag = channelbag
+        self._frames = np.asarray(frames, dtype=np.float64)
+
+    def get_curve(self, data_path: str, index: int, group: str = ''):
+        fcurves = self._channelbag.fcurves
+        curve = fcurves.find(data_path, index=index)
+
+        if curve is not None:
+            return curve
+
+        curve = fcurves.new(data_path, index=index)
+
+        if group:
+            groups = self._channelbag.groups
+            curve.group = groups.get(group) or groups.new(group)
+
+        return curve
+
+    def write_curve(self, curve: bpy.types.FCurve, values: np.ndarray):
+        points = curve.keyframe_points
+        frames = self._frames
+        count = len(points)
+
+        old = {}
+        for attr, size, dtype in KEYFRAME_ARRAYS:
+            data = np.empty(count * size, dtype=dtype)
+            points.foreach_get(attr, data)
+            old[attr] = data.reshape(count, size)
+
+        keep = (old['co'][:, 0] < frames[0]) | (old['co'][:, 0] > frames[-1])
+        kept = int(np.count_nonzero(keep))
+        total = kept + len(frames)
+        order = np.argsort(np.concatenate((old['co'][keep, 0], frames)), kind='stable')
+
+        points.clear()
+        points.add(total)
+
+        for attr, size, dtype in KEYFRAME_ARRAYS:
+            # Baked keys get defaults of added points, auto clamped handles are set by update
+            data = np.empty(total * size, dtype=dtype)
+            points.foreach_get(attr, data)
+            data = data.reshape(total, size)
+            data[:kept] = old[attr][keep]
+
+            if attr == 'co':
+                data[kept:] = np.stack((frames, values), axis=1)
+            elif attr == 'interpolation':
+                data[kept:] = INTERPOLATION_BEZIER
+
+            points.foreach_set(attr, data[order].ravel())
+
+        curve.update()
+
+    def write(self, data_path: str, values: np.ndarray, group: str = ''):
+        values = np.asarray(values, dtype=np.float64).reshape(len(self._frames), -1)
+
+        for index in range(values.shape[1]):
+            self.write_curve(
+                self.get_curve(data_path, index, group),
+                values[:, index]
+            )
@@ -0,0 +1,230 @@
+import numpy as np
+
+
+def euler_to_matrix(angles: np.ndarray, order: str = 'XYZ') -> np.ndarray:
+    count = angles.shape[0]
+    result = np.broadcast_to(np.eye(3), (count, 3, 3)).copy()
+
+    for axis in order:
+        index = 'XYZ'.index(axis)
+        a = angles[:, index]
+        cos, sin = np.cos(a), np.sin(a)
+
+        rot = np.zeros((count, 3, 3))
+        i, j = (index + 1) % 3, (index + 2) % 3
+        rot[:, index, index] = 1
+        rot[:, i, i] = cos
+        rot[:, i, j] = -sin
+        rot[:, j, i] = sin
+        rot[:, j, j] = cos
+
+        result = rot @ result
+
+    return result
+
+
+def quaternion_to_matrix(quats: np.ndarray) -> np.ndarray:
+    length = np.linalg.norm(quats, axis=1, keepdims=True)
+    length[length < 1e-8] = 1
+    w, x, y, z = (quats / length).T
+
+    result = np.empty((quats.shape[0], 3, 3))
+    result[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    result[:, 0, 1] = 2 * (x * y - w * z)
+    result[:, 0, 2] = 2 * (x * z + w * y)
+    result[:, 1, 0] = 2 * (x * y + w * z)
+    result[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    result[:, 1, 2] = 2 * (y * z - w * x)
+    result[:, 2, 0] = 2 * (x * z - w * y)
+    result[:, 2, 1] = 2 * (y * z + w * x)
+    result[:, 2, 2] = 1 - 2 * (x * x + y * y)
+
+    return result
+
+
+def axis_angle_to_matrix(axis_angle: np.ndarray) -> np.ndarray:
+    half = axis_angle[:, 0] * .5
+    axis = axis_angle[:, 1:]
+    length = np.linalg.norm(axis, axis=1, keepdims=True)
+    length[length < 1e-8] = 1
+
+    quats = np.empty((axis_angle.shape[0], 4))
+    quats[:, 0] = np.cos(half)
+    quats[:, 1:] = axis / length * np.sin(half)[:, None]
+
+    return quaternion_to_matrix(quats)
+
+
+def matrix_to_quaternion(mats: np.ndarray) -> np.ndarray:
+    m = mats[:, :3, :3]
+    result = np.empty((m.shape[0], 4))
+
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    case_w = trace > 0
+    case_x = ~case_w & (m[:, 0, 0] >= m[:, 1, 1]) & (m[:, 0, 0] >= m[:, 2, 2])
+    case_y = ~case_w & ~case_x & (m[:, 1, 1] >= m[:, 2, 2])
+    case_z = ~(case_w | case_x | case_y)
+
+    c = m[case_w]
+    s = np.sqrt(trace[case_w] + 1) * 2
+    result[case_w] = np.stack((
+        s * .25,
+        (c[:, 2, 1] - c[:, 1, 2]) / s,
+        (c[:, 0, 2] - c[:, 2, 0]) / s,
+        (c[:, 1, 0] - c[:, 0, 1]) / s,
+    ), axis=1)
+
+    c = m[case_x]
+    s = np.sqrt(1 + c[:, 0, 0] - c[:, 1, 1] - c[:, 2, 2]) * 2
+    result[case_x] = np.stack((
+        (c[:, 2, 1] - c[:, 1, 2]) / s,
+        s * .25,
+        (c[:, 0, 1] + c[:, 1, 0]) / s,
+        (c[:, 0, 2] + c[:, 2, 0]) / s,
+    ), axis=1)
+
+    c = m[case_y]
+    s = np.sqrt(1 + c[:, 1, 1] - c[:, 0, 0] - c[:, 2, 2]) * 2
+    result[case_y] = np.stack((
+        (c[:, 0, 2] - c[:, 2, 0]) / s,
+        (c[:, 0, 1] + c[:, 1, 0]) / s,
+        s * .25,
+        (c[:, 1, 2] + c[:, 2, 1]) / s,
+    ), axis=1)
+
+    c = m[case_z]
+    s = np.sqrt(1 + c[:, 2, 2] - c[:, 0, 0] - c[:, 1, 1]) * 2
+    result[case_z] = np.stack((
+        (c[:, 1, 0] - c[:, 0, 1]) / s,
+        (c[:, 0, 2] + c[:, 2, 0]) / s,
+        (c[:, 1, 2] + c[:, 2, 1]) / s,
+        s * .25,
+    ), axis=1)
+
+    return result / np.linalg.norm(result, axis=1, keepdims=True)
+
+
+def quaternion_slerp(q1: np.ndarray, q2: np.ndarray, t: np.ndarray) -> np.ndarray:
+    dot = np.sum(q1 * q2, axis=1)
+    q2 = np.where(dot[:, None] < 0, -q2, q2)
+    dot = np.clip(np.abs(dot), 0, 1)
+
+    theta = np.arccos(dot)
+    sin = np.sin(theta)
+    small = sin < 1e-6
+    safe_sin = np.where(small, 1, sin)
+
+    w1 = np.where(small, 1 - t, np.sin((1 - t) * theta) / safe_sin)
+    w2 = np.where(small, t, np.sin(t * theta) / safe_sin)
+
+    return q1 * w1[:, None] + q2 * w2[:, None]
+
+
+def polar_decompose(mats: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    u, s, vt = np.linalg.svd(mats)
+    flip = np.linalg.det(u @ vt) < 0
+    u[flip, :, -1] *= -1
+
+    rot = u @ vt
+    return rot, np.swapaxes(rot, 1, 2) @ mats
+
+
+def matrix_lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Batched version of mathutils Matrix.lerp"""
+    t = np.broadcast_to(np.asarray(t, dtype=np.float64), (a.shape[0],))
+
+    rot_a, scale_a = polar_decompose(a[:, :3, :3])
+    rot_b, scale_b = polar_decompose(b[:, :3, :3])
+
+    rot = quaternion_to_matrix(quaternion_slerp(
+        matrix_to_quaternion(rot_a),
+        matrix_to_quaternion(rot_b),
+        t
+    ))
+    scale = scale_a + (scale_b - scale_a) * t[:, None, None]
+
+    result = np.broadcast_to(np.eye(4), a.shape).copy()
+    result[:, :3, :3] = rot @ scale
+    result[:, :3, 3] = a[:, :3, 3] + (b[:, :3, 3] - a[:, :3, 3]) * t[:, None]
+
+    return result
+
+
+def quaternion_multiply(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    w1, x1, y1, z1 = np.moveaxis(q1, -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(q2, -1, 0)
+
+    return np.stack((
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    ), axis=-1)
+
+
+def matrix_to_euler(mats: np.ndarray, order: str = 'XYZ') -> np.ndarray:
+    i, j, k = ('XYZ'.index(axis) for axis in order)
+    parity = order not in ('XYZ', 'YZX', 'ZXY')
+    m = mats[:, :3, :3]
+
+    cy = np.hypot(m[:, i, i], m[:, j, i])
+
+    result = np.empty((m.shape[0], 3))
+    result[:, i] = np.arctan2(m[:, k, j], m[:, k, k])
+    result[:, j] = np.arctan2(-m[:, k, i], cy)
+    result[:, k] = np.arctan2(m[:, j, i], m[:, i, i])
+
+    if parity:
+        result = -result
+
+    return np.unwrap(result, axis=0)
+
+
+def quaternion_make_compatible(quats: np.ndarray) -> np.ndarray:
+    result = quats.copy()
+
+    for index in range(1, result.shape[0]):
+        if np.dot(result[index], result[index - 1]) < 0:
+            result[index] = -result[index]
+
+    return result
+
+
+def quaternion_to_axis_angle(quats: np.ndarray) -> np.ndarray:
+    half = np.arccos(np.clip(quats[:, 0], -1, 1))
+    sin = np.sin(half)
+    sin = np.where(np.abs(sin) < 0.0005, 1, sin)
+
+    result = np.empty(quats.shape)
+    result[:, 0] = half * 2
+    result[:, 1:] = quats[:, 1:] / sin[:, None]
+    result[np.all(result[:, 1:] == 0, axis=1), 2] = 1
+
+    return result
+
+
+def damped_track(mats: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Batched DAMPED_TRACK constraint with TRACK_Y"""
+    head = mats[:, :3, 3]
+    track = mats[:, :3, 1] / np.linalg.norm(mats[:, :3, 1], axis=1, keepdims=True)
+
+    target = targets - head
+    length = np.linalg.norm(target, axis=1, keepdims=True)
+    valid = length[:, 0] > 1e-8
+    target = target / np.where(length > 1e-8, length, 1)
+
+    axis = np.cross(track, target)
+    sin = np.linalg.norm(axis, axis=1)
+    cos = np.sum(track * target, axis=1)
+    valid &= sin > 1e-8
+
+    half = np.arctan2(sin, cos) * .5
+    quats = np.zeros((mats.shape[0], 4))
+    quats[:, 0] = 1
+    quats[valid, 0] = np.cos(half[valid])
+    quats[valid, 1:] = axis[valid] / sin[valid, None] * np.sin(half[valid])[:, None]
+
+    result = mats.copy()
+    result[:, :3, :3] = quaternion_to_matrix(quats) @ mats[:, :3, :3]
+
+    return result
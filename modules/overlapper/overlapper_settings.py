@@ -14,4 +14,12 @@ class OverlapperSettings(bpy.types.PropertyGroup):
 
     wind: bpy.props.FloatVectorProperty(subtype='XYZ')
 
-    bake_offset: bpy.props.IntProperty(default=0, name='Bake Offset', min=0)
\ No newline at end of file
+    bake_offset: bpy.props.IntProperty(default=0, name='Bake Offset', min=0)
+    bake_mode: bpy.props.EnumProperty(items=(
+        ('SCENE', 'Scene', 'Evaluate every frame through frame_set'),
+        ('FCURVES', 'FCurves', 'Sample action fcurves directly, constraints and drivers are ignored'),
+    ), name='Bake Mode')
+    key_backend: bpy.props.EnumProperty(items=(
+        ('KEYFRAME_INSERT', 'Keyframe Insert', 'Insert keys through keyframe_insert and nla.bake'),
+        ('DIRECT', 'Direct', 'Write solved rotations straight into action fcurves'),
+    ), name='Key Backend')
@@ -0,0 +1,97 @@
+import numpy as np
+import bpy
+from bpy_extras import anim_utils
+from .np_math import axis_angle_to_matrix, euler_to_matrix, quaternion_to_matrix
+
+
+class FCurvePoseSampler:
+    """Work without frame_set, not evaluates constraints, drivers and inherit modes"""
+    _arm: bpy.types.Object
+    _frames: np.ndarray
+    _channelbag: bpy.types.ActionChannelbag | None
+    _basis_cache: dict[str, np.ndarray]
+    _pose_cache: dict[str, np.ndarray]
+
+    def __init__(self, arm: bpy.types.Object, frames: range):
+        self._arm = arm
+        self._frames = np.array(frames, dtype=np.float64)
+
+        anim_data = arm.animation_data
+        self._channelbag = None
+
+        if anim_data and anim_data.action and anim_data.action_slot:
+            self._channelbag = anim_utils.action_get_channelbag_for_slot(anim_data.action, anim_data.action_slot)
+
+        self._basis_cache = {}
+        self._pose_cache = {}
+
+    @property
+    def frame_count(self):
+        return len(self._frames)
+
+    @property
+    def matrix_world(self) -> np.ndarray:
+        return np.array(self._arm.matrix_world)
+
+    def sample_property(self, bone: bpy.types.PoseBone, prop: str) -> np.ndarray:
+        default = getattr(bone, prop)
+        result = np.empty((self.frame_count, len(default)))
+        data_path = bone.path_from_id(prop)
+
+        for index, value in enumerate(default):
+            curve = None
+            if self._channelbag is not None:
+                curve = self._channelbag.fcurves.find(data_path, index=index)
+
+            if curve is None or curve.mute:
+                result[:, index] = value
+                continue
+
+            result[:, index] = [curve.evaluate(frame) for frame in self._frames]
+
+        return result
+
+    def matrix_basis(self, bone: bpy.types.PoseBone) -> np.ndarray:
+        result = self._basis_cache.get(bone.name)
+
+        if result is not None:
+            return result
+
+        mode = bone.rotation_mode
+
+        if mode == 'QUATERNION':
+            rot = quaternion_to_matrix(
+                self.sample_property(bone, 'rotation_quaternion'))
+        elif mode == 'AXIS_ANGLE':
+            rot = axis_angle_to_matrix(
+                self.sample_property(bone, 'rotation_axis_angle'))
+        else:
+            rot = euler_to_matrix(
+                self.sample_property(bone, 'rotation_euler'), mode)
+
+        scale = self.sample_property(bone, 'scale')
+
+        result = np.broadcast_to(np.eye(4), (self.frame_count, 4, 4)).copy()
+        result[:, :3, :3] = rot * scale[:, None, :]
+        result[:, :3, 3] = self.sample_property(bone, 'location')
+
+        self._basis_cache[bone.name] = result
+        return result
+
+    def pose_matrix(self, bone: bpy.types.PoseBone) -> np.ndarray:
+        result = self._pose_cache.get(bone.name)
+
+        if result is not None:
+            return result
+
+        rest = np.array(bone.bone.matrix_local)
+
+        if bone.parent is None:
+            result = rest @ self.matrix_basis(bone)
+        else:
+            parent_rest = np.array(bone.parent.bone.matrix_local)
+            offset = np.linalg.inv(parent_rest) @ rest
+            result = self.pose_matrix(bone.parent) @ offset @ self.matrix_basis(bone)
+
+        self._pose_cache[bone.name] = result
+        return result
@@ -1,25 +1,49 @@
-from dataclasses import field, dataclass
 import math
 from typing import Optional
 
+import numpy as np
 from mathutils import Matrix, Vector
 from .utils import add_empty
-from .bone import OvBone
+from .bone import OvBone, ov_bone_cache
+from .pose_sampler import FCurvePoseSampler
+from .np_math import (damped_track, matrix_lerp, matrix_to_euler, matrix_to_quaternion,
+                      polar_decompose, quaternion_make_compatible, quaternion_to_axis_angle)
+from .fcurve_writer import FCurveWriter, ensure_channelbag
 import bpy
 
 
-@dataclass
+MATRIX_KINDS = ('matrix_world', 'matrix_basis', 'matrix_offset', 'matrix_result', 'matrix_vel')
+
+
+def _frame_matrix(kind: str):
+    def getter(self: 'TransformFrame') -> Matrix:
+        return Matrix(self._record.get_array(kind)[self._index].tolist())
+
+    def setter(self: 'TransformFrame', value: Matrix):
+        self._record.get_array(kind)[self._index] = value
+
+    return property(getter, setter)
+
+
 class TransformFrame:
-    matrix_world: Matrix
-    matrix_basis: Matrix
-    matrix_offset: Matrix
+    _record: 'BoneRecord'
+    _index: int
 
-    matrix_result: Matrix = field(default_factory=Matrix)
-    matrix_vel: Matrix = field(default_factory=Matrix)
+    matrix_world = _frame_matrix('matrix_world')
+    matrix_basis = _frame_matrix('matrix_basis')
+    matrix_offset = _frame_matrix('matrix_offset')
+
+    matrix_result = _frame_matrix('matrix_result')
+    matrix_vel = _frame_matrix('matrix_vel')
+
+    def __init__(self, record: 'BoneRecord', index: int):
+        self._record = record
+        self._index = index
 
 
 class BoneRecord:
-    _frames: dict[int, TransformFrame]
+    _arrays: dict[str, np.ndarray]
+    _first_frame: int = 0
     _bone: OvBone
     _baker: 'TransformBaker'
     index: int = -1
@@ -28,15 +52,51 @@ class BoneRecord:
 
     def __init__(self, arm: str, bone: str, parent: 'BoneRecord'):
         self._bone = OvBone(arm, bone)
-        self._frames = {}
+        self.allocate(0, 0)
         self.parent = parent
 
     @property
     def raw(self):
         return self._bone
 
-    def add_frame(self, frame: int, transform: TransformFrame):
-        self._frames[frame] = transform
+    @property
+    def frame_count(self):
+        return self._arrays['matrix_world'].shape[0]
+
+    def allocate(self, first_frame: int, count: int):
+        self._first_frame = first_frame
+        self._arrays = {
+            kind: np.broadcast_to(np.eye(4), (count, 4, 4)).copy()
+            for kind in MATRIX_KINDS
+        }
+
+    def get_array(self, kind: str) -> np.ndarray:
+        return self._arrays[kind]
+
+    def _frame_index(self, frame: int) -> int:
+        index = frame - self._first_frame
+
+        if index < 0 or index >= self.frame_count:
+            raise KeyError(frame)
+
+        return index
+
+    def add_frame(self, frame: int, matrix_world: Matrix, matrix_basis: Matrix, matrix_offset: Matrix):
+        index = self._frame_index(frame)
+        arrays = self._arrays
+
+        arrays['matrix_world'][index] = matrix_world
+        arrays['matrix_basis'][index] = matrix_basis
+        arrays['matrix_offset'][index] = matrix_offset
+        arrays['matrix_result'][index] = matrix_world
+
+    def set_frames(self, matrix_world: np.ndarray, matrix_basis: np.ndarray, matrix_offset: np.ndarray):
+        arrays = self._arrays
+
+        arrays['matrix_world'][:] = matrix_world
+        arrays['matrix_basis'][:] = matrix_basis
+        arrays['matrix_offset'][:] = matrix_offset
+        arrays['matrix_result'][:] = matrix_world
 
     def get_frame(self, frame: int) -> TransformFrame:
         
@@ -46,7 +106,16 @@ class BoneRecord:
         if frame >= self._baker.end:
             frame = self._baker.end
         
-        return self._frames[frame]
+        return TransformFrame(self, self._frame_index(frame))
+
+    def get_frames(self, kind: str, frames: np.ndarray) -> np.ndarray:
+        frames = np.clip(np.asarray(frames), self._baker.start, self._baker.end)
+        index = frames - self._first_frame
+
+        if index.size and (index.min() < 0 or index.max() >= self.frame_count):
+            raise KeyError(frames)
+
+        return self._arrays[kind][index]
 
     def get_interpolated(self, frame: float):
         floor_frame = math.floor(frame)
@@ -59,6 +128,26 @@ class BoneRecord:
 
         return f1.matrix_world.lerp(f2.matrix_world, relative_time), f1.matrix_offset.lerp(f2.matrix_result, relative_time)
 
+    def get_interpolated_range(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        frames = np.asarray(frames, dtype=np.float64)
+        floor_frames = np.floor(frames).astype(int)
+        ceil_frames = np.ceil(frames).astype(int)
+
+        relative_time = frames - floor_frames
+
+        world = matrix_lerp(
+            self.get_frames('matrix_world', floor_frames),
+            self.get_frames('matrix_world', ceil_frames),
+            relative_time
+        )
+        result = matrix_lerp(
+            self.get_frames('matrix_offset', floor_frames),
+            self.get_frames('matrix_result', ceil_frames),
+            relative_time
+        )
+
+        return world, result
+
 
 class TransformBaker:
     _records: dict[str, BoneRecord]
@@ -103,6 +192,9 @@ class TransformBaker:
         bone_rec._baker = self
         return bone_rec
 
+    def get_record(self, name: str) -> Optional[BoneRecord]:
+        return self._records.get(name)
+
     def get_by_name(self, name: str, frame: int):
         return self._records[name].get_frame(frame)
 
@@ -110,30 +202,65 @@ class TransformBaker:
         self._records.clear()
         self._is_bake = False
 
-    def bake(self, start: int, end: int, offset: int = 0):
+    def bake(self, start: int, end: int, offset: int = 0, mode: str = 'SCENE'):
         self._start = start
         self._end = end + 1
 
         self._offset = offset
+        ov_bone_cache.begin_session()
+
+        # Bound structs are not kept after bake, undo or edit mode may free them
+        try:
+            if mode == 'FCURVES':
+                self._bake_fcurves()
+            else:
+                self._bake_scene()
+        finally:
+            ov_bone_cache.invalidate()
+
+        self._is_bake = True
+
+    def _bake_scene(self):
+        frames = self.get_range_offset()
+
+        for i in self._records.values():
+            i.allocate(frames.start, len(frames))
 
-        for frame in self.get_range_offset():
+        for frame in frames:
             bpy.context.scene.frame_set(frame)
 
             for i in self._records.values():
-                _, rot, scale = i.raw.matrix.decompose()
-                mat = Matrix.LocRotScale(Vector(), rot, scale)
-
                 offset = Matrix.Translation(Vector((0, i.raw.bone.length, 0)))
 
                 mat = i.raw.matrix_world @ offset
 
-                i.add_frame(frame, TransformFrame(
+                i.add_frame(
+                    frame,
                     matrix_world=mat,
                     matrix_basis=i.raw.matrix_basis,
-                    matrix_offset=offset,
-                    matrix_result=mat
-                ))
-        self._is_bake = True
+                    matrix_offset=offset
+                )
+
+    def _bake_fcurves(self):
+        frames = self.get_range_offset()
+        samplers: dict[str, FCurvePoseSampler] = {}
+
+        for i in self._records.values():
+            sampler = samplers.get(i.raw.armature_name)
+
+            if sampler is None:
+                sampler = FCurvePoseSampler(i.raw.arm, frames)
+                samplers[i.raw.armature_name] = sampler
+
+            offset = np.array(Matrix.Translation(
+                Vector((0, i.raw.bone.length, 0))))
+
+            i.allocate(frames.start, len(frames))
+            i.set_frames(
+                matrix_world=sampler.matrix_world @ sampler.pose_matrix(i.raw.bone) @ offset,
+                matrix_basis=sampler.matrix_basis(i.raw.bone),
+                matrix_offset=offset
+            )
 
     def get_bone_records(self):
         return list(self._records.items())
@@ -155,9 +282,10 @@ class ConstraintCreator:
     def __init__(self, baker: TransformBaker):
         self._baker = baker
 
-    def create_constraints(self):
+    def create_constraints(self, backend: str = 'KEYFRAME_INSERT'):
         baker = self._baker
         bb = baker.get_bone_records()
+        frames = np.array(baker.get_range())
 
         for i in range(len(bb)):
             _, bone_rec = bb[i]
@@ -170,6 +298,15 @@ class ConstraintCreator:
 
             bone_rec.raw.damped_track_to(self.CONST_NAME, empty)
 
+            if backend == 'DIRECT':
+                result = bone_rec.get_frames('matrix_result', frames)
+                writer = FCurveWriter(ensure_channelbag(empty), frames)
+                writer.write('location', result[:, :3, 3])
+                order = empty.rotation_mode if len(empty.rotation_mode) == 3 else 'XYZ'
+                writer.write('rotation_euler', matrix_to_euler(
+                    polar_decompose(result[:, :3, :3])[0], order))
+                continue
+
             for frame in baker.get_range():
                 empty.matrix_world = bone_rec\
                     .get_frame(frame)\
@@ -177,6 +314,59 @@ class ConstraintCreator:
                 empty.keyframe_insert(data_path='location', frame=frame)
                 empty.keyframe_insert(data_path='rotation_euler', frame=frame)
 
+    def _solve_pose(self, record: BoneRecord, frames: np.ndarray, arm_inv: np.ndarray,
+                    poses: dict[str, tuple[np.ndarray, np.ndarray]]):
+        name = record.raw.bone_name
+
+        if name in poses:
+            return poses[name]
+
+        bone = record.raw.bone
+        parent_rec = self._baker.get_record(bone.parent.name) if bone.parent else None
+
+        if parent_rec is None:
+            pose = arm_inv @ record.get_frames('matrix_world', frames)\
+                @ np.linalg.inv(record.get_frames('matrix_offset', frames))
+        else:
+            _, parent_pose = self._solve_pose(parent_rec, frames, arm_inv, poses)
+            offset = np.linalg.inv(np.array(bone.parent.bone.matrix_local))\
+                @ np.array(bone.bone.matrix_local)
+            pose = parent_pose @ offset @ record.get_frames('matrix_basis', frames)
+
+        target = arm_inv @ record.get_frames('matrix_result', frames)
+
+        poses[name] = pose, damped_track(pose, target[:, :3, 3])
+        return poses[name]
+
+    def bake_action(self, obj: bpy.types.Object, action: bpy.types.Action):
+        """Write what nla.bake gives for the damped track constraints, without scene evaluation"""
+        # Only baked range is keyed, nla.bake also keys bake offset pre-roll and one frame after end
+        frames = np.array(self._baker.get_range())
+        writer = FCurveWriter(ensure_channelbag(obj, action), frames)
+        arm_inv = np.linalg.inv(np.array(obj.matrix_world))
+        poses = {}
+
+        for name, record in self._baker.get_bone_records():
+            pose, pose_tracked = self._solve_pose(record, frames, arm_inv, poses)
+            basis = record.get_frames('matrix_basis', frames)\
+                @ np.linalg.inv(pose) @ pose_tracked
+            rotation, _ = polar_decompose(basis[:, :3, :3])
+
+            bone = record.raw.bone
+            mode = bone.rotation_mode
+
+            if mode == 'QUATERNION':
+                prop = 'rotation_quaternion'
+                values = quaternion_make_compatible(matrix_to_quaternion(rotation))
+            elif mode == 'AXIS_ANGLE':
+                prop = 'rotation_axis_angle'
+                values = quaternion_to_axis_angle(matrix_to_quaternion(rotation))
+            else:
+                prop = 'rotation_euler'
+                values = matrix_to_euler(rotation, mode)
+
+            writer.write(bone.path_from_id(prop), values, group=name)
+
     def remove_constraints(self):
         for bone in bpy.context.selected_pose_bones:
             empty = bpy.data.objects.get(
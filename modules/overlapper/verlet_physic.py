@@ -1,159 +1,215 @@
-import math
-from mathutils import Matrix, Quaternion, Vector
-EPS = 1e-8
-
-
-def get_angle(a, b, c):
-    u = (a - b).normalized()
-    v = (c - b).normalized()
-    return math.acos(max(-1.0, min(1.0, u.dot(v))))
-
-
-class VerletObject:
-    mat: Matrix
-    location: Vector
-    rot: Quaternion
-    old_location: Vector
-    rest: float = 0
-    index: int
-
-    def __init__(self):
-        self.mat = Matrix()
-        self.location = Vector()
-        self.rot = Quaternion()
-        self.rest_angle = Vector()
-        self.old_location = Vector()
-        self.index = -1
-
-
-class AngleConstraint:
-    p1: VerletObject
-    p2: VerletObject
-    p3: VerletObject
-    rest_angle: float
-
-    def __init__(self, p1: VerletObject, p2: VerletObject, p3: VerletObject):
-        self.p1 = p1
-        self.p2 = p2
-        self.p3 = p3
-        # self.rest_angle = get_angle(p1.location, p2.location, p3.location)
-        self.rest_angle = math.pi / 2
+from dataclasses import dataclass, field
 
-    def apply(self, stiffness=.2):
-        a = self.p1.location
-        b = self.p2.location
+import numpy as np
 
-        diff = a - b
-        rot = self.p1.mat.to_quaternion() @ diff.normalized().rotation_difference(Vector((math.pi, 0, 0)))
-        # rot.
-
-        self.p2.rot = rot
-        self.p2.location += rot @ diff * (1 - self.p2.index / 10) * .05
+EPS = 1e-8
 
 
-class VerletPhysic:
-    _objects: list[VerletObject]
-    _angle_constraints: list[AngleConstraint]
-
-    def __init__(self):
-        self._objects = []
-        self._angle_constraints = []
-        leng = 1
-        obj_count = 10
-        for i in range(obj_count):
-            obj = VerletObject()
-            obj.location.z = leng * i
-            obj.rest = leng
-            obj.index = i
-
-            self._objects.append(obj)
-
-        for i in range(obj_count - 1):
-            self._angle_constraints.append(AngleConstraint(
-                self._objects[i], self._objects[i+1], self._objects[i]))
+def color_constraints(indices: np.ndarray, particle_count: int) -> np.ndarray:
+    """Greedy coloring, constraints with same color never share a particle"""
+    colors = np.empty(len(indices), dtype=np.int32)
+    used: list[set[int]] = [set() for _ in range(particle_count)]
 
-    @property
-    def objects(self):
-        return self._objects
+    for index, particles in enumerate(indices):
+        taken = set().union(*(used[i] for i in particles))
+        color = 0
 
-    def update(self) -> None:
-        dt = 1/60
-        gravity = Vector((0, 0, -1))
+        while color in taken:
+            color += 1
 
-        for i, ob in enumerate(self._objects):
-            if i == 0:
-                continue
-            velocity = (ob.location - ob.old_location) * .98
-            ob.old_location = ob.location.copy()
+        colors[index] = color
 
-            ob.location += velocity
-            ob.location += gravity * dt
+        for i in particles:
+            used[i].add(color)
 
-        for step in range(100):
-            for i in range(len(self.objects) - 1):
+    return colors
 
-                obj = self._objects[i]
-                obj_next = self._objects[i + 1]
 
-                pos_diff = obj.location - obj_next.location
+@dataclass
+class DistanceConstraints:
+    indices: np.ndarray = field(default_factory=lambda: np.empty((0, 2), dtype=np.int32))
+    rest: np.ndarray = field(default_factory=lambda: np.empty(0))
+    compliance: np.ndarray = field(default_factory=lambda: np.empty(0))
+    colors: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
 
-                dist = pos_diff.length
-                diff = dist - obj.rest
+    def add(self, indices: np.ndarray, rest: np.ndarray, compliance: float):
+        self.indices = np.concatenate((self.indices, indices.astype(np.int32)))
+        self.rest = np.concatenate((self.rest, rest))
+        self.compliance = np.concatenate((self.compliance, np.full(len(rest), compliance)))
 
-                change_dir = pos_diff.normalized()
-                change_vector = change_dir * diff
+    def update_colors(self, particle_count: int):
+        self.colors = color_constraints(self.indices, particle_count)
 
-                if (i != 0):
-                    obj.location -= change_vector * .5
-                    obj_next.location += change_vector * .5
-                else:
-                    obj_next.location += change_vector * .1
 
-        for i in self._angle_constraints:
-            i.apply()
-        # for step in range(100):
-        #     for i in range(len(self.objects) - 1):
+@dataclass
+class AngleConstraints:
+    indices: np.ndarray = field(default_factory=lambda: np.empty((0, 3), dtype=np.int32))
+    rest_angle: np.ndarray = field(default_factory=lambda: np.empty(0))
+    distance: DistanceConstraints = field(default_factory=DistanceConstraints)
 
-        #         obj = self._objects[i]
-        #         obj_next = self._objects[i + 1]
+    def add(self, indices: np.ndarray, positions: np.ndarray, compliance: float):
+        a, b, c = positions[indices[:, 0]], positions[indices[:, 1]], positions[indices[:, 2]]
+        ab, cb = np.linalg.norm(a - b, axis=1), np.linalg.norm(c - b, axis=1)
+        cos = np.sum((a - b) * (c - b), axis=1) / np.maximum(ab * cb, EPS)
 
-        #         diff = obj_next.location - obj.location
-        #         dist = diff.length
+        self.indices = np.concatenate((self.indices, indices.astype(np.int32)))
+        self.rest_angle = np.concatenate((self.rest_angle, np.arccos(np.clip(cos, -1, 1))))
 
-        #         if dist < .0001: continue
+        # Angle at b is kept through the a-c distance, lengths of ab and cb are held by stretch constraints
+        rest = np.sqrt(np.maximum(ab * ab + cb * cb - 2 * ab * cb * cos, 0))
+        self.distance.add(indices[:, (0, 2)], rest, compliance)
 
-        #         delta_dist = (dist - obj.rest) / dist
-        #         correction = 0.5 * diff * delta_dist
 
-        #         if i != 0:
-        #             obj.location += correction
-        #         obj_next.location -= correction
+@dataclass
+class VerletChain:
+    start: int
+    count: int
 
-        #         # n = diff.normalized()
-        #         # velocity_diff = obj_next.velocity - obj.velocity
+    @property
+    def slice(self):
+        return slice(self.start, self.start + self.count)
 
-        #         # vn = n * velocity_diff.dot(n)
-        #         # # print(n, velocity_diff)
-        #         # # if i != 0:
-        #         # # print(velocity_diff.dot(n) )
-        #         # obj.velocity += 0.5 * vn
-        #         # obj_next.velocity -= 0.5 * vn
 
-        # for i in range(len(self.objects) - 1):
-        #     obj = self._objects[i]
-        #     obj_next = self._objects[i + 1]
+class VerletPhysic:
+    _positions: np.ndarray
+    _old_positions: np.ndarray
+    _targets: np.ndarray
+    _inv_mass: np.ndarray
+    _stretch: DistanceConstraints
+    _angles: AngleConstraints
+    _chains: list[VerletChain]
+
+    iterations: int = 10
+    relaxation: str = 'GAUSS_SEIDEL'
+    jacobi_factor: float = 1.5
+    damping: float = .98
+    gravity: np.ndarray
+
+    def __init__(self, iterations: int = 10, relaxation: str = 'GAUSS_SEIDEL'):
+        self._positions = np.empty((0, 3))
+        self._old_positions = np.empty((0, 3))
+        self._targets = np.empty((0, 3))
+        self._inv_mass = np.empty(0)
+        self._stretch = DistanceConstraints()
+        self._angles = AngleConstraints()
+        self._chains = []
+
+        self.iterations = iterations
+        self.relaxation = relaxation
+        self.gravity = np.array((0, 0, -9.8))
 
-        #     diff = obj_next.location - obj.location
-        #     dist = diff.length
+    @property
+    def positions(self):
+        return self._positions
 
-        #     if dist < .0001: continue
+    @property
+    def chains(self):
+        return self._chains
 
-        #     n = diff.normalized()
-        #     velocity_diff = obj_next.velocity - obj.velocity
+    def clear(self):
+        self.__init__(self.iterations, self.relaxation)
 
-        #     vn = n * velocity_diff.dot(n)
-        #     # print(n, velocity_diff)
-        #     # if i != 0:
-        #     print(velocity_diff.dot(n) )
-        #     obj.velocity += 0.5 * vn
-        #     obj_next.velocity -= 0.5 * vn
+    def add_chain(self, positions: np.ndarray, pinned: int = 1,
+                  stretch_compliance: float = 0, angle_compliance: float = 1e-4) -> VerletChain:
+        positions = np.asarray(positions, dtype=np.float64)
+        count = len(positions)
+        start = len(self._positions)
+        chain = VerletChain(start, count)
+
+        inv_mass = np.ones(count)
+        inv_mass[:pinned] = 0
+
+        self._positions = np.concatenate((self._positions, positions))
+        self._old_positions = np.concatenate((self._old_positions, positions))
+        self._targets = np.concatenate((self._targets, positions))
+        self._inv_mass = np.concatenate((self._inv_mass, inv_mass))
+
+        index = np.arange(start, start + count)
+
+        self._stretch.add(
+            np.stack((index[:-1], index[1:]), axis=1),
+            np.linalg.norm(positions[1:] - positions[:-1], axis=1),
+            stretch_compliance
+        )
+
+        if count > 2:
+            self._angles.add(
+                np.stack((index[:-2], index[1:-1], index[2:]), axis=1),
+                self._positions,
+                angle_compliance
+            )
+
+        particle_count = len(self._positions)
+        self._stretch.update_colors(particle_count)
+        self._angles.distance.update_colors(particle_count)
+
+        self._chains.append(chain)
+        return chain
+
+    def set_targets(self, chain: VerletChain, positions: np.ndarray):
+        """Pinned particles of chain follow targets"""
+        self._targets[chain.slice] = positions
+
+    def get_positions(self, chain: VerletChain) -> np.ndarray:
+        return self._positions[chain.slice]
+
+    def _project(self, constraints: DistanceConstraints, mask, lambdas: np.ndarray, alpha: np.ndarray):
+        pos, inv_mass = self._positions, self._inv_mass
+        i, j = constraints.indices[mask, 0], constraints.indices[mask, 1]
+
+        diff = pos[i] - pos[j]
+        dist = np.linalg.norm(diff, axis=1)
+        normal = diff / np.maximum(dist, EPS)[:, None]
+
+        w1, w2 = inv_mass[i], inv_mass[j]
+        weight = w1 + w2 + alpha[mask]
+        constraint = dist - constraints.rest[mask]
+
+        delta = np.where(
+            weight > EPS,
+            (-constraint - alpha[mask] * lambdas[mask]) / np.maximum(weight, EPS),
+            0
+        )
+        lambdas[mask] += delta
+
+        correction = normal * delta[:, None]
+        return i, j, w1[:, None] * correction, w2[:, None] * correction
+
+    def _solve_gauss_seidel(self, constraints: DistanceConstraints, lambdas: np.ndarray, alpha: np.ndarray):
+        for color in range(constraints.colors.max(initial=-1) + 1):
+            mask = constraints.colors == color
+            i, j, corr1, corr2 = self._project(constraints, mask, lambdas, alpha)
+
+            self._positions[i] += corr1
+            self._positions[j] -= corr2
+
+    def _solve_jacobi(self, constraints: DistanceConstraints, lambdas: np.ndarray, alpha: np.ndarray):
+        mask = slice(None)
+        i, j, corr1, corr2 = self._project(constraints, mask, lambdas, alpha)
+
+        delta = np.zeros_like(self._positions)
+        np.add.at(delta, i, corr1)
+        np.add.at(delta, j, -corr2)
+
+        counts = np.bincount(constraints.indices.ravel(), minlength=len(self._positions))
+        self._positions += delta * (self.jacobi_factor / np.maximum(counts, 1))[:, None]
+
+    def update(self, dt: float = 1 / 60) -> None:
+        pos = self._positions
+        free = self._inv_mass > 0
+
+        velocity = (pos - self._old_positions) * self.damping
+        self._old_positions = pos.copy()
+
+        pos[free] += velocity[free] + self.gravity * dt * dt
+        pos[~free] = self._targets[~free]
+
+        solve = self._solve_jacobi if self.relaxation == 'JACOBI' else self._solve_gauss_seidel
+        sets = (self._stretch, self._angles.distance)
+        lambdas = [np.zeros(len(i.rest)) for i in sets]
+        alphas = [i.compliance / (dt * dt) for i in sets]
+
+        for _ in range(self.iterations):
+            for constraints, lam, alpha in zip(sets, lambdas, alphas):
+                if len(constraints.rest):
+                    solve(constraints, lam, alpha)
@@ -25,6 +25,10 @@ class OvVisualShader:
         self.batch = batch_for_shader(self.shader, 'LINES', {"pos": self.points, 'color': self._colors})
 
     def draw(self, obj: 'OvVisualObject'):
+        # Created on first draw, GPU module is not available in background mode
+        if self.batch is None:
+            self.init()
+
         matrix = bpy.context.region_data.perspective_matrix
 
         matrix = matrix @ obj.transforms.matrix_world
@@ -65,7 +69,6 @@ class OvVisualizer:
 
         self._xyz_shader.add_point(0, 0, 0, color=Vector((0, 0, 1)))
         self._xyz_shader.add_point(0, 0, 1, color=Vector((0, 0, 1)))
-        self._xyz_shader.init()
 
         self._objects = {}
 
@@ -3,6 +3,7 @@ import json
 import bpy
 
 from .face_conf import face_conf
+from ..armature_index import armature_index
 from .preset import Preset, ShapeProperty
 from ..rift.generators.eye_target import EYE_TARGET_NAME
 from ...base_panel import RiftBasePanel
@@ -40,20 +41,10 @@ def get_preset(category: str):
 
 
 def get_objects_by_armature(armature: bpy.types.Object) -> list[bpy.types.Object]:
-    objects: list[bpy.types.Object] = []
-    for obj_mod in bpy.data.objects.values():
-        obj_mod: bpy.types.Object
-        if not isinstance(obj_mod.data, bpy.types.Mesh): continue
-
-        if obj_mod.data.shape_keys is None:
-            continue
-
-        for mod in obj_mod.modifiers.values():
-            mod: bpy.types.ArmatureModifier
-            if isinstance(mod, bpy.types.ArmatureModifier) and mod.object == armature:
-                objects.append(obj_mod)
-
-    return objects
+    return [
+        obj for obj in armature_index.get_objects(armature)
+        if isinstance(obj.data, bpy.types.Mesh) and obj.data.shape_keys is not None
+    ]
 
 
 def on_character_preset_change(category: str):
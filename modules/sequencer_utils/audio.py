@@ -1,12 +1,11 @@
-import datetime
 import os
-import time
 import re
-from dataclasses import dataclass
 
 import unicodedata
 
 import bpy
+from .mixdown import MixdownPool, mixdown_jobs, plan_jobs
+from .srt import iter_srt, load_srt_index
 from ...base_panel import BasePanel
 
 
@@ -35,56 +34,6 @@ class ZENU_OT_export_selected_strips(bpy.types.Operator):
         return {'FINISHED'}
 
 
-def string_to_time(value: str):
-    x = time.strptime(value.split(',')[0], '%H:%M:%S')
-
-    return datetime.timedelta(hours=x.tm_hour, minutes=x.tm_min, seconds=x.tm_sec).total_seconds()
-
-
-@dataclass
-class SrtBlock:
-    number: int
-    time_start: float
-    time_end: float
-    body: str
-
-    @property
-    def frame_start(self):
-        return int(self.time_start * bpy.context.scene.render.fps)
-
-    @property
-    def frame_end(self):
-        return int(self.time_end * bpy.context.scene.render.fps)
-
-
-def parse_srt(srt_path: str):
-    srt_path: str = bpy.path.abspath(srt_path)
-    r_unwanted = re.compile("[\n\t\r]")
-    result = []
-
-    with open(srt_path, mode='r') as f:
-        blocks = f.read().split('\n\n')
-
-    for block in blocks:
-        try:
-            subtitle_number, timing, body = block.split('\n', maxsplit=2)
-        except ValueError as e:
-            print(e)
-            continue
-        subtitle_number = int(subtitle_number)
-        time_start, time_end = tuple(string_to_time(i.strip()) for i in timing.split('-->'))
-        body = r_unwanted.sub('', body)
-
-        result.append(SrtBlock(
-            number=subtitle_number,
-            time_start=time_start,
-            time_end=time_end,
-            body=body
-        ))
-
-    return result
-
-
 class ZENU_OT_add_srt_markers(bpy.types.Operator):
     bl_label = 'Add Srt Markers'
     bl_idname = 'zenu.add_srt_markers'
@@ -92,7 +41,7 @@ class ZENU_OT_add_srt_markers(bpy.types.Operator):
 
     def execute(self, context: bpy.types.Context):
         srt_path: str = context.scene.zenu_srt_path
-        for block in parse_srt(srt_path):
+        for block in iter_srt(srt_path):
             context.scene.timeline_markers.new(f'{block.number}) {block.body}', frame=block.frame_start)
             context.scene.timeline_markers.new(f'{block.number}) End', frame=block.frame_end)
 
@@ -108,9 +57,12 @@ class ZENU_OT_cut_strip_by_srt(bpy.types.Operator):
         srt_path: str = context.scene.zenu_srt_path
         strip = context.active_sequence_strip
         sound: bpy.types.Sound = strip.sound
+        fps = context.scene.render.fps
         print(sound.filepath)
 
-        for block in parse_srt(srt_path):
+        index = load_srt_index(srt_path)
+
+        for block in index.overlapping_frames(strip.frame_final_start, strip.frame_final_end, fps):
             strip1 = context.scene.sequence_editor.sequences.new_sound(name='Test', frame_start=block.frame_start,
                                                                        channel=0,
                                                                        filepath='')
@@ -136,22 +88,25 @@ class ZENU_OT_export_selected_strips(bpy.types.Operator):
         # if not os.path.exists(audio_path):
         #     os.mkdir(audio_path)
 
-        frame_start = context.scene.frame_start
-        frame_end = context.scene.frame_end
+        jobs = plan_jobs(list(context.selected_sequences), audio_path, slugify)
+        workers = context.scene.zenu_audio_export_workers
+        wm = context.window_manager
 
-        for strip in context.selected_sequences:
-            strip: bpy.types.Sequence
+        def on_progress(done: int):
+            wm.progress_update(done)
+            print(f'[MIXDOWN] {done}/{len(jobs)}')
 
-            context.scene.frame_start = int(strip.frame_final_start)
-            context.scene.frame_end = int(strip.frame_final_end)
-
-            name = slugify(strip.name)
-
-            bpy.ops.sound.mixdown(filepath=os.path.join(audio_path, f'{name}.wav'), codec='AAC')
-
-        context.scene.frame_start = frame_start
-        context.scene.frame_end = frame_end
+        wm.progress_begin(0, len(jobs))
 
+        try:
+            if workers > 1:
+                MixdownPool(workers).run(jobs, on_progress)
+            else:
+                mixdown_jobs(context.scene, jobs, on_progress)
+        finally:
+            wm.progress_end()
+
+        self.report({'INFO'}, f'Exported {len(jobs)} strips to {audio_path}')
         return {'FINISHED'}
 
 
@@ -166,6 +121,7 @@ class ZENU_PT_Utils(BasePanel):
         col.prop(context.scene, 'zenu_srt_path')
         col.operator(ZENU_OT_add_srt_markers.bl_idname)
         col.prop(context.scene, 'zenu_audio_export')
+        col.prop(context.scene, 'zenu_audio_export_workers')
         col.operator(ZENU_OT_export_selected_strips.bl_idname)
 
 
@@ -181,6 +137,9 @@ def register():
     bpy.types.Scene.zenu_srt_path = bpy.props.StringProperty(name='Srt Path', subtype='FILE_PATH')
     bpy.types.Scene.zenu_audio_export = bpy.props.StringProperty(name='Audio Export Path', subtype='DIR_PATH',
                                                                  default='//')
+    bpy.types.Scene.zenu_audio_export_workers = bpy.props.IntProperty(
+        name='Workers', default=1, min=1, soft_max=16,
+        description='Background Blender processes used for strip export')
     reg()
 
 
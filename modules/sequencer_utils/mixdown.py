@@ -0,0 +1,86 @@
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+import bpy
+
+from ...worker_pool import WorkerPool
+
+WORKER_ENTRY = 'modules.sequencer_utils.mixdown:mixdown_chunk'
+
+
+@dataclass
+class MixdownJob:
+    name: str
+    filepath: str
+    frame_start: int
+    frame_end: int
+
+
+def plan_jobs(strips: list[bpy.types.Strip], folder: str, slugify: Callable[[str], str]) -> list[MixdownJob]:
+    """Jobs in timeline order, equal names get numbered so output does not depend on selection order"""
+    strips = sorted(strips, key=lambda s: (s.frame_final_start, s.channel, s.name))
+    used: dict[str, int] = {}
+    jobs = []
+
+    for strip in strips:
+        name = slugify(strip.name)
+        count = used.get(name, 0) + 1
+        used[name] = count
+
+        if count > 1:
+            name = f'{name}-{count}'
+
+        jobs.append(MixdownJob(
+            name=name,
+            filepath=os.path.join(folder, f'{name}.wav'),
+            frame_start=int(strip.frame_final_start),
+            frame_end=int(strip.frame_final_end)
+        ))
+
+    return jobs
+
+
+def mixdown_job(scene: bpy.types.Scene, job: MixdownJob):
+    scene.frame_start = job.frame_start
+    scene.frame_end = job.frame_end
+
+    bpy.ops.sound.mixdown(filepath=job.filepath, codec='AAC')
+
+
+def mixdown_jobs(scene: bpy.types.Scene, jobs: list[MixdownJob], on_progress: Callable[[int], None] = None):
+    frame_start = scene.frame_start
+    frame_end = scene.frame_end
+
+    try:
+        for index, job in enumerate(jobs):
+            mixdown_job(scene, job)
+
+            if on_progress:
+                on_progress(index + 1)
+    finally:
+        scene.frame_start = frame_start
+        scene.frame_end = frame_end
+
+
+def mixdown_chunk(data: list[dict[str, Any]], progress: Callable[[str], None]) -> int:
+    """Worker side of MixdownPool"""
+    jobs = [MixdownJob(**job) for job in data]
+    mixdown_jobs(bpy.context.scene, jobs, lambda done: progress(jobs[done - 1].name))
+    return len(jobs)
+
+
+class MixdownPool:
+    """Mixdown jobs in background Blender processes from a saved snapshot of current file"""
+    _workers: int
+
+    def __init__(self, workers: int):
+        self._workers = max(1, workers)
+
+    def run(self, jobs: list[MixdownJob], on_progress: Callable[[int], None] = None):
+        workers = min(self._workers, len(jobs))
+
+        WorkerPool(WORKER_ENTRY, 'Mixdown').run([
+            [asdict(job) for job in jobs[index::workers]]
+            for index in range(workers)
+        ], on_progress)
@@ -0,0 +1,203 @@
+import os
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+import bpy
+
+r_unwanted = re.compile("[\n\t\r]")
+r_timestamp = re.compile(r'(\d+):(\d+):(\d+)(?:[,.](\d+))?')
+
+
+def string_to_time(value: str):
+    match = r_timestamp.match(value.strip())
+
+    if match is None:
+        raise ValueError(f'Wrong srt timestamp {value!r}')
+
+    hours, minutes, seconds, fraction = match.groups()
+    time = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+    if fraction:
+        time += int(fraction) / 10 ** len(fraction)
+
+    return time
+
+
+@dataclass
+class SrtBlock:
+    number: int
+    time_start: float
+    time_end: float
+    body: str
+
+    @property
+    def frame_start(self):
+        return int(self.time_start * bpy.context.scene.render.fps)
+
+    @property
+    def frame_end(self):
+        return int(self.time_end * bpy.context.scene.render.fps)
+
+
+def _parse_block(lines: list[str]) -> SrtBlock | None:
+    try:
+        subtitle_number, timing, *body = lines
+        number = int(subtitle_number)
+        time_start, time_end = (string_to_time(i) for i in timing.split('-->'))
+    except ValueError as e:
+        print(e)
+        return None
+
+    return SrtBlock(
+        number=number,
+        time_start=time_start,
+        time_end=time_end,
+        body=r_unwanted.sub('', ''.join(body))
+    )
+
+
+def iter_srt(srt_path: str) -> Iterator[SrtBlock]:
+    """Yield cues while reading file line by line"""
+    srt_path: str = bpy.path.abspath(srt_path)
+    lines = []
+
+    with open(srt_path, mode='r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+
+            if line.strip():
+                lines.append(line)
+                continue
+
+            if lines:
+                block = _parse_block(lines)
+                lines = []
+
+                if block is not None:
+                    yield block
+
+    if lines:
+        block = _parse_block(lines)
+
+        if block is not None:
+            yield block
+
+
+def parse_srt(srt_path: str) -> list[SrtBlock]:
+    return list(iter_srt(srt_path))
+
+
+@dataclass
+class _IntervalNode:
+    center: float
+    by_start: list[int]
+    starts: list[float]
+    by_end: list[int]
+    neg_ends: list[float]
+    left: '_IntervalNode | None'
+    right: '_IntervalNode | None'
+
+
+class SrtIndex:
+    """Centered interval tree over cues, queries find k cues in O(log n + k) and return them sorted by start"""
+    blocks: list[SrtBlock]
+    _root: _IntervalNode | None
+
+    def __init__(self, blocks: Iterable[SrtBlock]):
+        self.blocks = sorted(blocks, key=lambda b: (b.time_start, b.time_end))
+        self._root = self._build(list(range(len(self.blocks))))
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def _build(self, indices: list[int]) -> _IntervalNode | None:
+        if not indices:
+            return None
+
+        blocks = self.blocks
+        points = sorted(t for i in indices for t in (blocks[i].time_start, blocks[i].time_end))
+        # Median endpoint, both children get at most half of cues so depth is O(log n)
+        center = points[len(points) // 2]
+        left, right, here = [], [], []
+
+        for i in indices:
+            if blocks[i].time_end < center:
+                left.append(i)
+            elif blocks[i].time_start > center:
+                right.append(i)
+            else:
+                here.append(i)
+
+        by_start = sorted(here, key=lambda i: blocks[i].time_start)
+        by_end = sorted(here, key=lambda i: -blocks[i].time_end)
+
+        return _IntervalNode(
+            center=center,
+            by_start=by_start,
+            starts=[blocks[i].time_start for i in by_start],
+            by_end=by_end,
+            neg_ends=[-blocks[i].time_end for i in by_end],
+            left=self._build(left),
+            right=self._build(right),
+        )
+
+    def _query(self, time_start: float, time_end: float, closed: bool) -> list[SrtBlock]:
+        """Cues with end > time_start and start < time_end, or start <= time_end when closed"""
+        blocks = self.blocks
+        bisect_start = bisect_right if closed else bisect_left
+        starts_before = (lambda t: t <= time_end) if closed else (lambda t: t < time_end)
+        result = []
+        stack = [self._root]
+
+        while stack:
+            node = stack.pop()
+
+            if node is None:
+                continue
+
+            # Cues of node contain center, only a prefix of one of sorted lists can match
+            if time_end <= node.center:
+                count = bisect_start(node.starts, time_end)
+                result.extend(i for i in node.by_start[:count] if blocks[i].time_end > time_start)
+                stack.append(node.left)
+            elif time_start >= node.center:
+                count = bisect_left(node.neg_ends, -time_start)
+                result.extend(i for i in node.by_end[:count] if starts_before(blocks[i].time_start))
+                stack.append(node.right)
+            else:
+                result.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+
+        return [blocks[i] for i in sorted(result)]
+
+    def overlapping(self, time_start: float, time_end: float) -> list[SrtBlock]:
+        """Cues intersecting [time_start, time_end)"""
+        return self._query(time_start, time_end, False)
+
+    def at_time(self, time: float) -> list[SrtBlock]:
+        return self._query(time, time, True)
+
+    def at_frame(self, frame: float, fps: float) -> list[SrtBlock]:
+        return self.at_time(frame / fps)
+
+    def overlapping_frames(self, frame_start: float, frame_end: float, fps: float) -> list[SrtBlock]:
+        return self.overlapping(frame_start / fps, frame_end / fps)
+
+
+_index_cache: dict[str, tuple[float, SrtIndex]] = {}
+
+
+def load_srt_index(srt_path: str) -> SrtIndex:
+    """Index is reused until file mtime changes"""
+    path = bpy.path.abspath(srt_path)
+    mtime = os.stat(path).st_mtime
+    mtime_cached, index = _index_cache.get(path, (None, None))
+
+    if mtime_cached != mtime:
+        index = SrtIndex(iter_srt(path))
+        _index_cache[path] = mtime, index
+
+    return index
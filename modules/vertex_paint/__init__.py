@@ -1,13 +1,15 @@
 import inspect
 import random
 import sys
-from typing import Set
+from bisect import bisect_left
+from typing import Any, Set
 from uuid import uuid4
 
 import bpy
 
 from ...base_panel import BasePanel
 from ...utils import update_window
+from .flatten import flatten_folder, write_corner_colors
 from bpy.types import NodeTree, NodeSocket
 
 
@@ -34,25 +36,70 @@ class VertexLayer(bpy.types.PropertyGroup):
     color: bpy.props.FloatVectorProperty()
 
 
+def longest_increasing_subsequence(values: list[int]) -> set[int]:
+    """Indices of values forming longest increasing subsequence, O(n log n)"""
+    tails: list[int] = []
+    tail_index: list[int] = []
+    previous: list[int] = [-1] * len(values)
+
+    for index, value in enumerate(values):
+        pos = bisect_left(tails, value)
+
+        if pos == len(tails):
+            tails.append(value)
+            tail_index.append(index)
+        else:
+            tails[pos] = value
+            tail_index[pos] = index
+
+        previous[index] = tail_index[pos - 1] if pos else -1
+
+    result = set()
+    index = tail_index[-1] if tail_index else -1
+
+    while index != -1:
+        result.add(index)
+        index = previous[index]
+
+    return result
+
+
+def apply_order(collection: bpy.types.bpy_prop_collection, target: list[int]):
+    """Reorder collection so item at target[i] ends up at i, with minimal number of moves"""
+    keep = longest_increasing_subsequence(target)
+    current = list(range(len(target)))
+    moves = 0
+
+    for k, item in enumerate(target):
+        if k in keep:
+            continue
+
+        src = current.index(item)
+        current.pop(src)
+        dst = current.index(target[k - 1]) + 1 if k else 0
+        current.insert(dst, item)
+
+        collection.move(src, dst)
+        moves += 1
+
+    return moves
+
+
 def sort_vertex_layers(obj: bpy.types.Object):
-    folders = {item.uid: item for item in obj.zenu_vertex_layer}  # if item.is_folder
+    layers = obj.zenu_vertex_layer
+    folders = {item.uid: item for item in layers}  # if item.is_folder
 
     def get_weight(item: VertexLayer):
         if item.is_folder:
             return item.index
         return folders[item.parent_uid].index - item.index
 
-    n = len(obj.zenu_vertex_layer)
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            item1 = obj.zenu_vertex_layer[j]
-            item2 = obj.zenu_vertex_layer[j + 1]
-
-            value1 = get_weight(item1)
-            value2 = get_weight(item2)
+    weights = [get_weight(item) for item in layers]
+    # Stable like previous bubble sort, equal weights keep their order
+    target = sorted(range(len(weights)), key=weights.__getitem__, reverse=True)
 
-            if value2 > value1:
-                obj.zenu_vertex_layer.move(j, j + 1)
+    if target != list(range(len(weights))):
+        apply_order(layers, target)
 
     generate_shader(obj)
 
@@ -66,7 +113,8 @@ def get_active_layer(obj: bpy.types.Object) -> VertexLayer | None:
 
 def get_layers(obj: bpy.types.Object) -> list[VertexLayer]:
     for index, item in enumerate(obj.zenu_vertex_layer):
-        item.order = index
+        if item.order != index:
+            item.order = index
 
     return list(obj.zenu_vertex_layer)
 
@@ -148,81 +196,256 @@ def get_frame(uid: str):
     return f'[Frame]{uid}'
 
 
-def generate_shader(obj: bpy.types.Object):
-    vertex_layers = get_shader(obj)
+def get_attr(uid: str):
+    return f'[Attr]{uid}'
 
-    # vertex_layers.nodes.clear()
 
-    sockets = vertex_layers.interface.items_tree.keys()
+def get_flatten_name(folder: VertexLayer) -> str:
+    # Folder names repeat, uid keeps flatten of each folder in its own attribute
+    return f'{folder.name}_{folder.uid[:8]}'
 
-    def get_or_create(name: str, type: str):
-        node = vertex_layers.nodes.get(name)
-        if node is None:
-            node = vertex_layers.nodes.new(type)
-            node.name = name
 
-        return node
+def get_node_uid(name: str):
+    for prefix in ('[Frame]', '[Attr]'):
+        if name.startswith(prefix):
+            return name[len(prefix):]
 
-    group_outputs = get_or_create('Output', 'NodeGroupOutput')
-    group_outputs.location = (0, 0)
+    return name
 
-    for y, folder in enumerate(get_folders(obj)):
-        if folder.name in sockets:
-            socket = vertex_layers.interface.items_tree.get(folder.name)
-        else:
-            socket = vertex_layers.interface.new_socket(folder.name, description=folder.uid, in_out='OUTPUT',
-                                                        socket_type='NodeSocketColor')
 
-        folder_frame: bpy.types.NodeFrame = get_or_create(get_frame(folder.uid), 'NodeFrame')
-        folder_frame.label = folder.name
-        folder_frame.location = (0, 0)
+def is_uid(value: str):
+    return len(value) == 32 and all(i in '0123456789abcdef' for i in value)
+
+
+def is_same(current, value) -> bool:
+    if isinstance(value, tuple):
+        return len(current) == len(value) and all(abs(a - b) < 1e-5 for a, b in zip(current, value))
+
+    return current == value
+
+
+def find_socket(sockets: bpy.types.bpy_prop_collection, identifier: str):
+    for socket in sockets:
+        if socket.identifier == identifier:
+            return socket
+
+    return None
+
+
+LAYER_COLOR = (0.608, 0.03546, 0)
+
+
+class ShaderGraphUpdater:
+    """Diff layer tree against existing node group, only differing nodes, links and sockets are touched"""
+    tree: bpy.types.ShaderNodeTree
+    changes: int = 0
+    _nodes: set[str]
+    _links: set[tuple[str, str, str, str]]
+
+    def __init__(self, obj: bpy.types.Object):
+        self.obj = obj
+        self.tree = get_shader(obj)
+        self._nodes = set()
+        self._links = set()
+
+    def set(self, data: bpy.types.bpy_struct, attr: str, value: Any):
+        if not is_same(getattr(data, attr), value):
+            setattr(data, attr, value)
+            self.changes += 1
+
+    def node(self, name: str, node_type: str) -> tuple[bpy.types.Node, bool]:
+        nodes = self.tree.nodes
+        node = nodes.get(name)
+        self._nodes.add(name)
+
+        if node is not None and node.bl_idname != node_type:
+            nodes.remove(node)
+            node = None
+
+        if node is not None:
+            return node, False
+
+        node = nodes.new(node_type)
+        node.name = name
+        self.changes += 1
+        return node, True
+
+    def link(self, from_socket: bpy.types.NodeSocket, to_socket: bpy.types.NodeSocket):
+        self._links.add((from_socket.node.name, from_socket.identifier, to_socket.node.name, to_socket.identifier))
+
+    def output_socket(self, folder: VertexLayer):
+        interface = self.tree.interface
+        socket = None
+
+        for item in interface.items_tree:
+            if item.item_type == 'SOCKET' and item.in_out == 'OUTPUT' and item.description == folder.uid:
+                socket = item
+                break
+
+        # Folders share default names, socket is matched only by uid
+        if socket is None:
+            socket = interface.new_socket(folder.name, description=folder.uid, in_out='OUTPUT',
+                                          socket_type='NodeSocketColor')
+            self.changes += 1
+
+        self.set(socket, 'name', folder.name)
+        return socket
+
+    def remove_stale_sockets(self, folders: list[VertexLayer]):
+        folder_uids = {i.uid for i in folders}
+        interface = self.tree.interface
+
+        for item in list(interface.items_tree):
+            if item.item_type != 'SOCKET' or item.in_out != 'OUTPUT':
+                continue
+
+            if is_uid(item.description) and item.description not in folder_uids:
+                interface.remove(item)
+                self.changes += 1
+
+    def update_folder(self, y: int, folder: VertexLayer, folder_layers: list[VertexLayer],
+                      group_outputs: bpy.types.Node):
+        socket = self.output_socket(folder)
+
+        folder_frame, created = self.node(get_frame(folder.uid), 'NodeFrame')
+        if created:
+            folder_frame.location = (0, 0)
+        self.set(folder_frame, 'label', folder.name)
 
         prev_mix = None
-        folder_layers = get_folder_layers(obj, folder)
         layers_len = len(folder_layers)
-        folder_layers.reverse()
-        for x, layer in enumerate(folder_layers, 1):
-            layer_frame: bpy.types.NodeFrame = get_or_create(get_frame(layer.uid), 'NodeFrame')
-            layer_frame.label = layer.name
-            layer_frame.location = (0, 0)
-            layer_frame.parent = folder_frame
-            layer_frame.use_custom_color = True
-            layer_frame.color = (0.608, 0.03546, 0)
+
+        for x, layer in enumerate(reversed(folder_layers), 1):
+            # Frames shrink to their content, location is set only on creation
+            layer_frame, created = self.node(get_frame(layer.uid), 'NodeFrame')
+            if created:
+                layer_frame.location = (0, 0)
+            self.set(layer_frame, 'label', layer.name)
+            self.set(layer_frame, 'parent', folder_frame)
+            self.set(layer_frame, 'use_custom_color', True)
+            self.set(layer_frame, 'color', LAYER_COLOR)
 
             node_x = -225 * x
             node_y = -500 * y
 
-            mix = get_or_create(layer.uid, 'ShaderNodeMix')
-            mix.data_type = 'RGBA'
-            mix.blend_type = 'MIX'
-            mix.label = f'[Mix]{layer.name}'
-            mix.location = (node_x, node_y)
+            # Blend type and colors are edited by user, they are set only on creation
+            mix, created = self.node(layer.uid, 'ShaderNodeMix')
+            if created:
+                mix.data_type = 'RGBA'
+                mix.blend_type = 'MIX'
+            self.set(mix, 'label', f'[Mix]{layer.name}')
+            self.set(mix, 'location', (node_x, node_y))
+            self.set(mix, 'parent', layer_frame)
 
-            attribute = get_or_create(f'[Attr]{layer.uid}', 'ShaderNodeAttribute')
-            attribute.attribute_name = layer.uid
-            attribute.label = layer.name
-            attribute.location = (node_x, node_y + 200)
+            attribute, _ = self.node(get_attr(layer.uid), 'ShaderNodeAttribute')
+            self.set(attribute, 'attribute_name', layer.uid)
+            self.set(attribute, 'label', layer.name)
+            self.set(attribute, 'location', (node_x, node_y + 200))
+            self.set(attribute, 'parent', layer_frame)
 
-            # vertex_layers.links.new(mix.inputs[6], attribute.outputs[0])
-            vertex_layers.links.new(mix.inputs[0], attribute.outputs[2])
+            self.link(attribute.outputs[2], mix.inputs[0])
 
             if prev_mix:
-                vertex_layers.links.new(mix.outputs[2], prev_mix.inputs[6])
+                self.link(mix.outputs[2], prev_mix.inputs[6])
 
             if x == 1:
-                vertex_layers.links.new(mix.outputs[2], group_outputs.inputs[socket.index])
+                self.link(mix.outputs[2], group_outputs.inputs[socket.index])
 
             if x == layers_len:
-                value = get_or_create(folder.uid, 'ShaderNodeRGB')
-                value.location = (node_x - 200, node_y)
-                value.label = folder.name
-                value.outputs[0].default_value = (1, 1, 1, 1)
-                vertex_layers.links.new(mix.inputs[6], value.outputs[0])
-                value.parent = folder_frame
+                value, created = self.node(folder.uid, 'ShaderNodeRGB')
+                if created:
+                    value.outputs[0].default_value = (1, 1, 1, 1)
+                self.set(value, 'location', (node_x - 200, node_y))
+                self.set(value, 'label', folder.name)
+                self.set(value, 'parent', folder_frame)
+                self.link(value.outputs[0], mix.inputs[6])
 
             prev_mix = mix
-            mix.parent = layer_frame
-            attribute.parent = layer_frame
+
+    def remove_stale_nodes(self, layers: list[VertexLayer]):
+        nodes = self.tree.nodes
+        known = {i.uid for i in layers}
+
+        for node in list(nodes):
+            if node.name in self._nodes:
+                continue
+
+            uid = get_node_uid(node.name)
+
+            if is_uid(uid) and uid not in known:
+                nodes.remove(node)
+                self.changes += 1
+
+    def update_links(self):
+        tree = self.tree
+        managed = self._nodes
+        desired = set(self._links)
+
+        for link in list(tree.links):
+            if link.from_node.name not in managed or link.to_node.name not in managed:
+                continue
+
+            key = (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+
+            if key in desired:
+                desired.remove(key)
+            else:
+                tree.links.remove(link)
+                self.changes += 1
+
+        for from_node, from_identifier, to_node, to_identifier in desired:
+            tree.links.new(
+                find_socket(tree.nodes[from_node].outputs, from_identifier),
+                find_socket(tree.nodes[to_node].inputs, to_identifier)
+            )
+            self.changes += 1
+
+    def update(self) -> int:
+        layers = get_layers(self.obj)
+        folders = [i for i in layers if i.is_folder]
+        children: dict[str, list[VertexLayer]] = {}
+
+        for layer in layers:
+            if not layer.is_folder:
+                children.setdefault(layer.parent_uid, []).append(layer)
+
+        # Before sockets are resolved, removal shifts group output socket indices
+        self.remove_stale_sockets(folders)
+
+        group_outputs, _ = self.node('Output', 'NodeGroupOutput')
+        self.set(group_outputs, 'location', (0, 0))
+
+        for y, folder in enumerate(folders):
+            self.update_folder(y, folder, children.get(folder.uid, []), group_outputs)
+
+        self.remove_stale_nodes(layers)
+        self.update_links()
+        return self.changes
+
+
+def generate_shader(obj: bpy.types.Object):
+    return ShaderGraphUpdater(obj).update()
+
+
+def flatten_layers(obj: bpy.types.Object) -> list[str]:
+    """Bake every folder into its own corner color attribute, same result as layer node group"""
+    generate_shader(obj)
+    nodes = get_shader(obj).nodes
+    mesh: bpy.types.Mesh = obj.data
+    layers = get_layers(obj)
+    names = []
+
+    for folder in (i for i in layers if i.is_folder):
+        mixes = [(i.uid, nodes.get(i.uid)) for i in layers if not i.is_folder and i.parent_uid == folder.uid]
+
+        if not mixes:
+            continue
+
+        name = get_flatten_name(folder)
+        write_corner_colors(mesh, name, flatten_folder(mesh, nodes.get(folder.uid), mixes))
+        names.append(name)
+
+    return names
 
 
 class ZENU_OT_move_vertex_layer(bpy.types.Operator):
@@ -399,6 +622,27 @@ class ZENU_OT_create_node_group(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class ZENU_OT_flatten_vertex_layer(bpy.types.Operator):
+    bl_label = 'Flatten Vertex Layers'
+    bl_idname = 'zenu.flatten_vertex_layer'
+    bl_options = {'UNDO'}
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and obj.mode != 'EDIT'
+
+    def execute(self, context: bpy.types.Context):
+        names = flatten_layers(context.active_object)
+
+        if not names:
+            self.report({'WARNING'}, 'No folders with layers')
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f'Flattened: {", ".join(names)}')
+        return {'FINISHED'}
+
+
 class ZENU_UL_vertex_paint_list(bpy.types.UIList):
     def draw_item(self, context, layout: bpy.types.UILayout, data, item: VertexLayer, icon, active_data,
                   active_propname):
@@ -440,6 +684,7 @@ class ZENU_PT_vertex_paint(BasePanel):
         layout.operator(ZENU_OT_move_vertex_layer.bl_idname)
         layout.operator(ZENU_OT_random_vertex_layer.bl_idname)
         layout.operator(ZENU_OT_create_node_group.bl_idname)
+        layout.operator(ZENU_OT_flatten_vertex_layer.bl_idname)
 
         row = layout.row(align=True)
         row.template_list('ZENU_UL_vertex_paint_list', '',
@@ -481,6 +726,7 @@ reg, unreg = bpy.utils.register_classes_factory((
     ZENU_OT_clear_vertex_layer,
     ZENU_OT_random_vertex_layer,
     ZENU_OT_create_node_group,
+    ZENU_OT_flatten_vertex_layer,
     ZENU_UL_vertex_paint_list,
     ZENU_PT_vertex_paint
 ))
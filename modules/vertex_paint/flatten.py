@@ -0,0 +1,206 @@
+import bpy
+import numpy as np
+
+
+def lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray):
+    return a + (b - a) * t
+
+
+def rgb_to_hsv(rgb: np.ndarray) -> np.ndarray:
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    cmax = rgb.max(axis=-1)
+    cmin = rgb.min(axis=-1)
+    delta = cmax - cmin
+
+    safe_max = np.where(cmax != 0, cmax, 1)
+    s = np.where(cmax != 0, delta / safe_max, 0)
+
+    safe_delta = np.where(delta != 0, delta, 1)
+    cr = (cmax - r) / safe_delta
+    cg = (cmax - g) / safe_delta
+    cb = (cmax - b) / safe_delta
+
+    h = np.where(r == cmax, cb - cg, np.where(g == cmax, 2 + cr - cb, 4 + cg - cr))
+    h = (h / 6) % 1
+    h = np.where(s != 0, h, 0)
+
+    return np.stack((h, s, cmax), axis=-1)
+
+
+def hsv_to_rgb(hsv: np.ndarray) -> np.ndarray:
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    h = (h % 1) * 6
+    i = np.floor(h)
+    f = h - i
+    p = v * (1 - s)
+    q = v * (1 - s * f)
+    t = v * (1 - s * (1 - f))
+
+    i = i.astype(np.int32) % 6
+    r = np.choose(i, (v, q, p, p, t, v))
+    g = np.choose(i, (t, v, v, q, p, p))
+    b = np.choose(i, (p, p, t, v, v, q))
+
+    return np.stack((r, g, b), axis=-1)
+
+
+def blend_burn(a, b, t):
+    tmp = (1 - t) + t * b
+    safe = np.where(tmp > 0, tmp, 1)
+    return np.where(tmp <= 0, 0, np.clip(1 - (1 - a) / safe, 0, 1))
+
+
+def blend_dodge(a, b, t):
+    tmp = 1 - t * b
+    safe = np.where(tmp > 0, tmp, 1)
+    value = np.where(tmp <= 0, 1, np.minimum(a / safe, 1))
+    return np.where(a != 0, value, a)
+
+
+def blend_overlay(a, b, t):
+    tm = 1 - t
+    return np.where(a < .5, a * (tm + 2 * t * b), 1 - (tm + 2 * t * (1 - b)) * (1 - a))
+
+
+def blend_soft_light(a, b, t):
+    screen = 1 - (1 - b) * (1 - a)
+    return (1 - t) * a + t * ((1 - a) * b * a + a * screen)
+
+
+def blend_divide(a, b, t):
+    safe = np.where(b != 0, b, 1)
+    return np.where(b != 0, (1 - t) * a + t * a / safe, a)
+
+
+def blend_hue(a, b, t):
+    hsv_b = rgb_to_hsv(b)
+    hsv = rgb_to_hsv(a)
+    hsv[..., 0] = hsv_b[..., 0]
+    return np.where(hsv_b[..., 1:2] != 0, lerp(a, hsv_to_rgb(hsv), t), a)
+
+
+def blend_saturation(a, b, t):
+    hsv = rgb_to_hsv(a)
+    hsv_b = rgb_to_hsv(b)
+    saturated = hsv[..., 1:2] != 0
+    hsv[..., 1] = lerp(hsv[..., 1], hsv_b[..., 1], t[..., 0])
+    return np.where(saturated, hsv_to_rgb(hsv), a)
+
+
+def blend_value(a, b, t):
+    hsv = rgb_to_hsv(a)
+    hsv_b = rgb_to_hsv(b)
+    hsv[..., 2] = lerp(hsv[..., 2], hsv_b[..., 2], t[..., 0])
+    return hsv_to_rgb(hsv)
+
+
+def blend_color(a, b, t):
+    hsv_b = rgb_to_hsv(b)
+    hsv = rgb_to_hsv(a)
+    hsv[..., :2] = hsv_b[..., :2]
+    return np.where(hsv_b[..., 1:2] != 0, lerp(a, hsv_to_rgb(hsv), t), a)
+
+
+# Same formulas as Mix Color node, a is lower stack, b is layer color, t is factor
+BLEND_MODES = {
+    'MIX': lambda a, b, t: lerp(a, b, t),
+    'DARKEN': lambda a, b, t: lerp(a, np.minimum(a, b), t),
+    'MULTIPLY': lambda a, b, t: lerp(a, a * b, t),
+    'BURN': blend_burn,
+    'LIGHTEN': lambda a, b, t: lerp(a, np.maximum(a, b), t),
+    'SCREEN': lambda a, b, t: 1 - ((1 - t) + t * (1 - b)) * (1 - a),
+    'DODGE': blend_dodge,
+    'ADD': lambda a, b, t: lerp(a, a + b, t),
+    'OVERLAY': blend_overlay,
+    'SOFT_LIGHT': blend_soft_light,
+    'LINEAR_LIGHT': lambda a, b, t: a + t * (2 * b - 1),
+    'DIFFERENCE': lambda a, b, t: lerp(a, np.abs(a - b), t),
+    'EXCLUSION': lambda a, b, t: np.maximum(lerp(a, a + b - 2 * a * b, t), 0),
+    'SUBTRACT': lambda a, b, t: lerp(a, a - b, t),
+    'DIVIDE': blend_divide,
+    'HUE': blend_hue,
+    'SATURATION': blend_saturation,
+    'COLOR': blend_color,
+    'VALUE': blend_value,
+}
+
+
+def blend(blend_type: str, a: np.ndarray, b: np.ndarray, t: np.ndarray, clamp_factor=True, clamp_result=False):
+    """a is (n, 3), b is (3,) or (n, 3), t is (n,)"""
+    if clamp_factor:
+        t = np.clip(t, 0, 1)
+
+    b = np.broadcast_to(b, a.shape)
+    result = BLEND_MODES[blend_type](a, b, t[:, None])
+
+    if clamp_result:
+        result = np.clip(result, 0, 1)
+
+    return result
+
+
+def read_corner_colors(mesh: bpy.types.Mesh, name: str) -> np.ndarray | None:
+    """Linear colors per corner, point attributes are expanded through corner vertices"""
+    attribute = mesh.color_attributes.get(name)
+
+    if attribute is None or attribute.domain not in {'CORNER', 'POINT'}:
+        return None
+
+    colors = np.empty(len(attribute.data) * 4, dtype=np.float32)
+    attribute.data.foreach_get('color', colors)
+    colors = colors.reshape(-1, 4)
+
+    if attribute.domain == 'POINT':
+        vertex_index = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get('vertex_index', vertex_index)
+        colors = colors[vertex_index]
+
+    return colors
+
+
+def write_corner_colors(mesh: bpy.types.Mesh, name: str, colors: np.ndarray):
+    attribute = mesh.color_attributes.get(name)
+
+    if attribute is not None and (attribute.domain != 'CORNER' or attribute.data_type != 'BYTE_COLOR'):
+        mesh.color_attributes.remove(attribute)
+        attribute = None
+
+    if attribute is None:
+        attribute = mesh.color_attributes.new(name, 'BYTE_COLOR', 'CORNER')
+
+    attribute.data.foreach_set('color', colors.astype(np.float32).ravel())
+    mesh.update()
+
+
+def flatten_folder(mesh: bpy.types.Mesh, base: bpy.types.ShaderNodeRGB | None,
+                   mixes: list[tuple[str, bpy.types.ShaderNodeMix | None]]) -> np.ndarray:
+    """Composite layers bottom to top like folder chain in layer node group"""
+    count = len(mesh.loops)
+    color = np.ones((count, 3), dtype=np.float32)
+
+    if base is not None:
+        color[:] = base.outputs[0].default_value[:3]
+
+    for attribute_name, mix in mixes:
+        if mix is None:
+            continue
+
+        colors = read_corner_colors(mesh, attribute_name)
+
+        # Missing attribute reads as zero factor in shader, layer has no effect
+        if colors is None:
+            continue
+
+        color = blend(
+            mix.blend_type,
+            color,
+            np.array(mix.inputs[7].default_value[:3], dtype=np.float32),
+            # Factor output of Attribute node is average of color, alpha is not used
+            colors[:, :3].mean(axis=1),
+            clamp_factor=mix.clamp_factor,
+            clamp_result=mix.clamp_result,
+        )
+
+    result = np.ones((count, 4), dtype=np.float32)
+    result[:, :3] = color
+    return result
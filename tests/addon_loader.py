@@ -0,0 +1,24 @@
+import importlib
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'zenu_addon'
+
+
+def load_module(name: str):
+    """Import add-on module like 'modules.overlapper.angular_solver' without running package __init__ files,
+    they register panels and GPU drawers which need full Blender UI"""
+    package, path = PACKAGE, ROOT
+
+    for part in [None, *name.split('.')[:-1]]:
+        if part is not None:
+            package, path = f'{package}.{part}', os.path.join(path, part)
+
+        if package not in sys.modules:
+            module = types.ModuleType(package)
+            module.__path__ = [path]
+            sys.modules[package] = module
+
+    return importlib.import_module(f'{PACKAGE}.{name}')
@@ -0,0 +1,94 @@
+import unittest
+
+import numpy as np
+
+try:
+    # Standalone bpy module provides mathutils only after import
+    import bpy
+    from mathutils import Quaternion, Vector
+except ImportError:
+    raise unittest.SkipTest('bpy is not available')
+
+from addon_loader import load_module
+
+angular_solver = load_module('modules.overlapper.angular_solver')
+
+
+class TestSolveBatch(unittest.TestCase):
+    count = 32
+    steps = 240
+    tolerance = 1e-5
+    near_aligned = 1e-3
+
+    def random_quaternions(self, rng: np.random.Generator) -> np.ndarray:
+        quats = rng.normal(size=(self.count, 4))
+        return quats / np.linalg.norm(quats, axis=1, keepdims=True)
+
+    def test_matches_scalar_solve(self):
+        rng = np.random.default_rng(0)
+        solver = angular_solver.ZAngularSolver()
+
+        stiffness = rng.uniform(5, 200, self.count)
+        damping = rng.uniform(0.5, 30, self.count)
+        current = self.random_quaternions(rng)
+        velocity = rng.normal(size=(self.count, 3))
+
+        for step in range(self.steps):
+            # New targets now and then so bones swing, some targets flip hemisphere
+            if step % 60 == 0:
+                target = self.random_quaternions(rng)
+
+            flip = np.sum(current * target, axis=1) < 0
+            delta = angular_solver.quaternion_multiply(
+                np.where(flip[:, None], -target, target), current * (1, -1, -1, -1))
+            half_angle_sin = np.linalg.norm(delta[:, 1:], axis=1)
+
+            scalar = []
+            for index in range(self.count):
+                solver.settings.stiffness = stiffness[index]
+                solver.settings.damping = damping[index]
+                q, vel = solver.solve(Quaternion(current[index]), Quaternion(target[index]), Vector(velocity[index]))
+                scalar.append((tuple(q), tuple(vel)))
+
+            # Both start every step from batch state, mathutils is single precision and would drift
+            current, velocity = solver.solve_batch(current, target, velocity, stiffness, damping)
+
+            scalar_current = np.array([q for q, _ in scalar])
+            scalar_velocity = np.array([vel for _, vel in scalar])
+
+            # q and -q are the same rotation
+            rotation_error = 1 - np.abs(np.sum(scalar_current * current, axis=1))
+            velocity_error = np.linalg.norm(scalar_velocity - velocity, axis=1) \
+                / np.maximum(np.linalg.norm(velocity, axis=1), 1)
+
+            # Quaternion.axis skips normalization below sin 0.0005 of half angle, single precision
+            # acos near 1 moves that switch, kick there differs by less than angle * stiffness * dt
+            velocity_tolerance = np.where(
+                half_angle_sin < self.near_aligned,
+                4 * self.near_aligned * stiffness * solver.delta_time,
+                self.tolerance
+            )
+
+            self.assertLess(rotation_error.max(), self.tolerance, f'step {step}')
+            self.assertTrue(np.all(velocity_error < velocity_tolerance), f'step {step}')
+
+    def test_scalar_settings_broadcast(self):
+        rng = np.random.default_rng(1)
+        solver = angular_solver.ZAngularSolver()
+        current = self.random_quaternions(rng)
+        target = self.random_quaternions(rng)
+        velocity = np.zeros((self.count, 3))
+
+        default = solver.solve_batch(current, target, velocity)
+        explicit = solver.solve_batch(
+            current, target, velocity,
+            np.full(self.count, solver.settings.stiffness),
+            np.full(self.count, solver.settings.damping)
+        )
+
+        np.testing.assert_allclose(default[0], explicit[0])
+        np.testing.assert_allclose(default[1], explicit[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
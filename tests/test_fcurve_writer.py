@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    raise unittest.SkipTest('bpy is not available')
+
+from addon_loader import load_module
+
+fcurve_writer = load_module('modules.overlapper.fcurve_writer')
+
+
+class TestFCurveWriter(unittest.TestCase):
+    def setUp(self):
+        self.obj = bpy.data.objects.new('fcurve_writer_test', None)
+        self.channelbag = fcurve_writer.ensure_channelbag(self.obj)
+        self.curve = self.channelbag.fcurves.new('location', index=0)
+
+        for frame, value in ((1, 0), (5, 1), (10, 2), (20, 3)):
+            self.curve.keyframe_points.insert(frame, value)
+
+        outside = self.curve.keyframe_points[0]
+        outside.handle_left_type = outside.handle_right_type = 'FREE'
+        outside.handle_left = (-2, 5)
+        outside.handle_right = (3, -4)
+        outside.interpolation = 'BACK'
+        outside.easing = 'EASE_IN'
+        outside.back = 3
+        outside.type = 'BREAKDOWN'
+
+    def tearDown(self):
+        bpy.data.actions.remove(self.obj.animation_data.action)
+        bpy.data.objects.remove(self.obj)
+
+    def test_keys_outside_range_are_kept(self):
+        frames = np.arange(4, 12)
+        fcurve_writer.FCurveWriter(self.channelbag, frames).write('location', frames * 10.0)
+
+        points = self.curve.keyframe_points
+        self.assertEqual([p.co.x for p in points], [1, *frames, 20])
+        np.testing.assert_allclose([p.co.y for p in points[1:-1]], frames * 10.0)
+
+        outside = points[0]
+        self.assertEqual(outside.handle_left_type, 'FREE')
+        self.assertEqual(tuple(outside.handle_left), (-2, 5))
+        self.assertEqual(tuple(outside.handle_right), (3, -4))
+        self.assertEqual(outside.interpolation, 'BACK')
+        self.assertEqual(outside.easing, 'EASE_IN')
+        self.assertAlmostEqual(outside.back, 3)
+        self.assertEqual(outside.type, 'BREAKDOWN')
+
+        for point in points[1:-1]:
+            self.assertEqual(point.interpolation, 'BEZIER')
+            self.assertEqual(point.type, 'KEYFRAME')
+
+
+if __name__ == '__main__':
+    unittest.main()
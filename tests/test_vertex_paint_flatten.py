@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    raise unittest.SkipTest('bpy is not available')
+
+from addon_loader import load_module
+
+flatten = load_module('modules.vertex_paint.flatten')
+
+A = (0.8, 0.3, 0.1)
+B = (0.2, 0.6, 0.9)
+
+# Mix Color node results for A and B, evaluated in Blender with geometry nodes
+MIX_NODE_RESULTS = [
+    ('MIX', 0.25, (0.65, 0.375, 0.3)),
+    ('MIX', 0.7, (0.38, 0.51, 0.66)),
+    ('MULTIPLY', 0.25, (0.64, 0.27, 0.0975)),
+    ('MULTIPLY', 0.7, (0.352, 0.216, 0.093)),
+    ('SCREEN', 0.25, (0.81, 0.405, 0.3025)),
+    ('SCREEN', 0.7, (0.828, 0.594, 0.667)),
+    ('OVERLAY', 0.25, (0.77, 0.315, 0.12)),
+    ('OVERLAY', 0.7, (0.716, 0.342, 0.156)),
+    ('BURN', 0.25, (0.75, 0.222222, 0.076923)),
+    ('BURN', 0.7, (0.545455, 0.027778, 0.032258)),
+    ('DODGE', 0.25, (0.842105, 0.352941, 0.129032)),
+    ('DODGE', 0.7, (0.930233, 0.517241, 0.27027)),
+    ('SOFT_LIGHT', 0.25, (0.776, 0.3105, 0.118)),
+    ('SOFT_LIGHT', 0.7, (0.7328, 0.3294, 0.1504)),
+    ('HUE', 0.25, (0.625, 0.35, 0.275)),
+    ('HUE', 0.7, (0.31, 0.44, 0.59)),
+    ('VALUE', 0.25, (0.825, 0.309375, 0.103125)),
+    ('VALUE', 0.7, (0.87, 0.32625, 0.10875)),
+]
+
+
+class TestBlend(unittest.TestCase):
+    def test_matches_mix_node(self):
+        for blend_type, factor, expected in MIX_NODE_RESULTS:
+            with self.subTest(blend_type=blend_type, factor=factor):
+                result = flatten.blend(blend_type, np.array([A]), np.array(B), np.array([factor]))
+                np.testing.assert_allclose(result[0], expected, atol=1e-5)
+
+    def test_hsv_round_trip(self):
+        rgb = np.random.default_rng(0).random((256, 3))
+
+        np.testing.assert_allclose(flatten.hsv_to_rgb(flatten.rgb_to_hsv(rgb)), rgb, atol=1e-6)
+
+
+class TestFlattenFolder(unittest.TestCase):
+    def setUp(self):
+        self.mesh = bpy.data.meshes.new('flatten_test')
+        self.mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+        self.tree = bpy.data.node_groups.new('flatten_test', 'ShaderNodeTree')
+
+    def tearDown(self):
+        bpy.data.meshes.remove(self.mesh)
+        bpy.data.node_groups.remove(self.tree)
+
+    def new_mix(self, blend_type: str, color: tuple[float, float, float]):
+        mix = self.tree.nodes.new('ShaderNodeMix')
+        mix.data_type = 'RGBA'
+        mix.blend_type = blend_type
+        mix.inputs[7].default_value = (*color, 1)
+        return mix
+
+    def test_color_average_is_factor(self):
+        # New layers are black with full alpha, shader factor is zero for them
+        unpainted = self.mesh.color_attributes.new('unpainted', 'BYTE_COLOR', 'CORNER')
+        unpainted.data.foreach_set('color', [0, 0, 0, 1] * 3)
+
+        painted = self.mesh.color_attributes.new('painted', 'FLOAT_COLOR', 'CORNER')
+        painted.data.foreach_set('color', [1, 1, 1, 0] * 3)
+
+        base = self.tree.nodes.new('ShaderNodeRGB')
+        base.outputs[0].default_value = (*A, 1)
+
+        result = flatten.flatten_folder(self.mesh, base, [
+            ('unpainted', self.new_mix('MIX', (0, 0, 1))),
+            ('painted', self.new_mix('MULTIPLY', B)),
+            ('missing', self.new_mix('MIX', (0, 1, 0))),
+        ])
+
+        np.testing.assert_allclose(result[:, :3], np.broadcast_to(np.multiply(A, B), (3, 3)), atol=1e-5)
+        np.testing.assert_allclose(result[:, 3], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
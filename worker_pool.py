@@ -0,0 +1,144 @@
+"""Background Blender workers
+
+Chunks of jobs run in background Blender processes opened from a saved snapshot of current file,
+in each of them this file is started as a script:
+
+blender --background snapshot.blend --python worker_pool.py -- module:function chunk.json result.json progress.txt
+"""
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+import bpy
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.basename(ROOT)
+
+
+class WorkerPool:
+    """Entry is 'module:function' of add-on, function gets a chunk and progress callback and returns json result"""
+    poll_interval: float = .2
+    _entry: str
+    _name: str
+
+    def __init__(self, entry: str, name: str = 'Background'):
+        self._entry = entry
+        self._name = name
+
+    def _spawn(self, snapshot: str, chunk_path: str, result_path: str, progress_path: str):
+        return subprocess.Popen([
+            bpy.app.binary_path,
+            '--background',
+            '--factory-startup',
+            snapshot,
+            '--python', os.path.abspath(__file__),
+            '--',
+            self._entry,
+            chunk_path,
+            result_path,
+            progress_path,
+        ])
+
+    @staticmethod
+    def _count_done(progress_path: str) -> int:
+        if not os.path.exists(progress_path):
+            return 0
+
+        with open(progress_path) as fs:
+            return sum(1 for line in fs if line.strip())
+
+    @staticmethod
+    def _stop(processes: list[subprocess.Popen]):
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+        for process in processes:
+            process.wait()
+
+    def run(self, chunks: list[Any], on_progress: Callable[[int], None] = None) -> list[Any]:
+        """Process per chunk, results are in order of chunks, on_progress gets total of reported jobs"""
+        if not chunks:
+            return []
+
+        temp = tempfile.mkdtemp(prefix='zenu_worker_')
+        processes = []
+        outputs = []
+
+        try:
+            snapshot = os.path.join(temp, 'snapshot.blend')
+            bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True)
+
+            for index, chunk in enumerate(chunks):
+                chunk_path = os.path.join(temp, f'chunk_{index}.json')
+                result_path = os.path.join(temp, f'result_{index}.json')
+                progress_path = os.path.join(temp, f'progress_{index}.txt')
+
+                with open(chunk_path, mode='w') as fs:
+                    fs.write(json.dumps(chunk))
+
+                processes.append(self._spawn(snapshot, chunk_path, result_path, progress_path))
+                outputs.append((result_path, progress_path))
+
+            done = 0
+            while True:
+                codes = [process.poll() for process in processes]
+                current = sum(self._count_done(progress_path) for _, progress_path in outputs)
+
+                if on_progress and current != done:
+                    on_progress(current)
+                done = current
+
+                for index, code in enumerate(codes):
+                    if code is not None and code != 0:
+                        raise RuntimeError(f'{self._name} worker {index} failed with code {code}')
+
+                if None not in codes:
+                    break
+
+                time.sleep(self.poll_interval)
+
+            results = []
+            for index, (result_path, _) in enumerate(outputs):
+                if not os.path.exists(result_path):
+                    raise RuntimeError(f'{self._name} worker {index} wrote no result')
+
+                with open(result_path) as fs:
+                    results.append(json.loads(fs.read()))
+
+            return results
+        finally:
+            # Workers still read snapshot, they are stopped before it is removed
+            self._stop(processes)
+            shutil.rmtree(temp, ignore_errors=True)
+
+
+def worker_main():
+    entry, chunk_path, result_path, progress_path = sys.argv[sys.argv.index('--') + 1:][:4]
+
+    sys.path.insert(0, os.path.dirname(ROOT))
+    module_name, function_name = entry.split(':')
+    function = getattr(importlib.import_module(f'{PACKAGE}.{module_name}'), function_name)
+
+    with open(chunk_path) as fs:
+        chunk = json.loads(fs.read())
+
+    with open(progress_path, mode='w') as progress:
+        def report(name: str):
+            progress.write(f'{name}\n')
+            progress.flush()
+
+        result = function(chunk, report)
+
+    with open(result_path, mode='w') as fs:
+        fs.write(json.dumps(result))
+
+
+if __name__ == '__main__':
+    worker_main()